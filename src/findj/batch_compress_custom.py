@@ -22,6 +22,12 @@ from rich.prompt import Prompt, Confirm
 
 console = Console()
 
+# 压缩级别可选值 (0-9)
+_LEVEL_CHOICES = tuple(map(str, range(10)))
+
+# 字节 -> MB 换算系数
+_MB = 1.0 / (1024.0 * 1024.0)
+
 
 def read_folder_list(file_path: str) -> List[str]:
     """
@@ -62,11 +68,16 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
                          keep_folder_structure: bool = True) -> None:
     """
     批量压缩文件夹
+
+    输出不是终端时(管道、日志文件、被其他脚本调用)不渲染 Panel/Table，
+    每个文件夹只输出一行纯文本结果。
     """
     if not folders:
         console.print("[red]没有有效的文件夹需要压缩[/red]")
         return
     
+    rich_output = console.is_terminal
+    
     # 创建压缩器实例
     compressor = ZipCompressor(compression_level=compression_level)
     
@@ -74,19 +85,30 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
     if output_dir:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
-        console.print(f"[cyan]输出目录: {output_path.absolute()}[/cyan]")
+        if rich_output:
+            console.print(f"[cyan]输出目录: {output_path.absolute()}[/cyan]")
+        else:
+            console.out(f"输出目录: {output_path.absolute()}", highlight=False)
     
     # 显示压缩配置
-    console.print(Panel(
-        f"[bold]批量压缩配置[/]\n"
-        f"文件夹数量: [green]{len(folders)}[/]\n"
-        f"压缩级别: [yellow]{compression_level}[/]\n"
-        f"删除源文件: [{'red' if delete_source else 'green'}]{delete_source}[/]\n"
-        f"保留文件夹结构: [{'green' if keep_folder_structure else 'yellow'}]{keep_folder_structure}[/]\n"
-        f"输出目录: [cyan]{output_dir or '与源文件夹同级'}[/]",
-        title="压缩设置",
-        border_style="blue"
-    ))
+    if rich_output:
+        console.print(Panel(
+            f"[bold]批量压缩配置[/]\n"
+            f"文件夹数量: [green]{len(folders)}[/]\n"
+            f"压缩级别: [yellow]{compression_level}[/]\n"
+            f"删除源文件: [{'red' if delete_source else 'green'}]{delete_source}[/]\n"
+            f"保留文件夹结构: [{'green' if keep_folder_structure else 'yellow'}]{keep_folder_structure}[/]\n"
+            f"输出目录: [cyan]{output_dir or '与源文件夹同级'}[/]",
+            title="压缩设置",
+            border_style="blue"
+        ))
+    else:
+        console.out(
+            f"批量压缩: {len(folders)} 个文件夹, 压缩级别={compression_level}, "
+            f"删除源文件={delete_source}, 保留文件夹结构={keep_folder_structure}, "
+            f"输出目录={output_dir or '与源文件夹同级'}",
+            highlight=False
+        )
     
     # 统计变量
     success_count = 0
@@ -95,20 +117,23 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
     total_compressed_size = 0
     
     # 创建结果表格
-    result_table = Table(show_header=True, header_style="bold blue")
-    result_table.add_column("序号", justify="right", style="yellow", width=4)
-    result_table.add_column("文件夹名", style="cyan", width=30)
-    result_table.add_column("状态", justify="center", width=8)
-    result_table.add_column("原始大小", justify="right", style="blue", width=12)
-    result_table.add_column("压缩后", justify="right", style="green", width=12)
-    result_table.add_column("压缩率", justify="right", style="magenta", width=8)
-    
-    # 开始批量压缩
-    console.print(f"\n[bold green]开始批量压缩 {len(folders)} 个文件夹...[/bold green]\n")
+    result_table = None
+    if rich_output:
+        result_table = Table(show_header=True, header_style="bold blue")
+        result_table.add_column("序号", justify="right", style="yellow", width=4)
+        result_table.add_column("文件夹名", style="cyan", width=30)
+        result_table.add_column("状态", justify="center", width=8)
+        result_table.add_column("原始大小", justify="right", style="blue", width=12)
+        result_table.add_column("压缩后", justify="right", style="green", width=12)
+        result_table.add_column("压缩率", justify="right", style="magenta", width=8)
+        
+        # 开始批量压缩
+        console.print(f"\n[bold green]开始批量压缩 {len(folders)} 个文件夹...[/bold green]\n")
     
     for i, folder_path in enumerate(folders, 1):
         folder_name = folder_path.name
-        console.print(f"[bold cyan]({i}/{len(folders)})[/] 正在处理: [bold]{folder_name}[/]")
+        if rich_output:
+            console.print(f"[bold cyan]({i}/{len(folders)})[/] 正在处理: [bold]{folder_name}[/]")
         
         try:
             # 确定压缩包输出路径
@@ -141,19 +166,46 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
                 
                 # 计算压缩率
                 ratio = (1 - result.compressed_size / result.original_size) * 100 if result.original_size > 0 else 0
+                original_mb = result.original_size * _MB
+                compressed_mb = result.compressed_size * _MB
                 
-                result_table.add_row(
-                    str(i),
-                    folder_name,
-                    "[green]✓[/]",
-                    f"{result.original_size/1024/1024:.1f}MB",
-                    f"{result.compressed_size/1024/1024:.1f}MB",
-                    f"{ratio:.1f}%"
-                )
-                
-                console.print(f"  [green]✓ 压缩成功: {target_zip.name}[/green]\n")
+                if rich_output:
+                    result_table.add_row(
+                        str(i),
+                        folder_name,
+                        "[green]✓[/]",
+                        f"{original_mb:.1f}MB",
+                        f"{compressed_mb:.1f}MB",
+                        f"{ratio:.1f}%"
+                    )
+                    
+                    console.print(f"  [green]✓ 压缩成功: {target_zip.name}[/green]\n")
+                else:
+                    console.out(
+                        f"({i}/{len(folders)}) OK {folder_name}: "
+                        f"{original_mb:.1f}MB -> {compressed_mb:.1f}MB "
+                        f"({ratio:.1f}%) {target_zip.name}",
+                        highlight=False
+                    )
             else:
                 fail_count += 1
+                if rich_output:
+                    result_table.add_row(
+                        str(i),
+                        folder_name,
+                        "[red]✗[/]",
+                        "N/A",
+                        "N/A",
+                        "N/A"
+                    )
+                    
+                    console.print(f"  [red]✗ 压缩失败: {result.error_message}[/red]\n")
+                else:
+                    console.out(f"({i}/{len(folders)}) FAIL {folder_name}: {result.error_message}", highlight=False)
+                
+        except Exception as e:
+            fail_count += 1
+            if rich_output:
                 result_table.add_row(
                     str(i),
                     folder_name,
@@ -162,26 +214,27 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
                     "N/A",
                     "N/A"
                 )
-                
-                console.print(f"  [red]✗ 压缩失败: {result.error_message}[/red]\n")
-                
-        except Exception as e:
-            fail_count += 1
-            result_table.add_row(
-                str(i),
-                folder_name,
-                "[red]✗[/]",
-                "N/A",
-                "N/A",
-                "N/A"
-            )
-            console.print(f"  [red]✗ 压缩出错: {str(e)}[/red]\n")
-    
-    # 显示结果表格
-    console.print(result_table)
+                console.print(f"  [red]✗ 压缩出错: {str(e)}[/red]\n")
+            else:
+                console.out(f"({i}/{len(folders)}) ERROR {folder_name}: {str(e)}", highlight=False)
     
     # 显示总结信息
     total_ratio = (1 - total_compressed_size / total_original_size) * 100 if total_original_size > 0 else 0
+    total_original_mb = total_original_size * _MB
+    total_compressed_mb = total_compressed_size * _MB
+    saved_mb = total_original_mb - total_compressed_mb
+    
+    if not rich_output:
+        console.out(
+            f"完成: 成功 {success_count}, 失败 {fail_count}, 总计 {len(folders)}; "
+            f"{total_original_mb:.1f}MB -> {total_compressed_mb:.1f}MB "
+            f"({total_ratio:.1f}%), 节省 {saved_mb:.1f}MB",
+            highlight=False
+        )
+        return
+    
+    # 显示结果表格
+    console.print(result_table)
     
     summary_panel = Panel(
         f"[bold green]压缩完成![/]\n\n"
@@ -190,10 +243,10 @@ def batch_compress_folders(folders: List[Path], output_dir: str = None,
         f"• 失败: [red]{fail_count}[/] 个\n"
         f"• 总计: [blue]{len(folders)}[/] 个\n\n"
         f"[bold]大小统计:[/]\n"
-        f"• 原始总大小: [blue]{total_original_size/1024/1024:.1f}MB[/]\n"
-        f"• 压缩后总大小: [green]{total_compressed_size/1024/1024:.1f}MB[/]\n"
+        f"• 原始总大小: [blue]{total_original_mb:.1f}MB[/]\n"
+        f"• 压缩后总大小: [green]{total_compressed_mb:.1f}MB[/]\n"
         f"• 总体压缩率: [magenta]{total_ratio:.1f}%[/]\n"
-        f"• 节省空间: [yellow]{(total_original_size-total_compressed_size)/1024/1024:.1f}MB[/]",
+        f"• 节省空间: [yellow]{saved_mb:.1f}MB[/]",
         title="批量压缩结果",
         border_style="green"
     )
@@ -272,7 +325,7 @@ def interactive_mode():
     # 获取压缩级别
     compression_level = int(Prompt.ask(
         "[bold yellow]请选择压缩级别 (0-9)[/bold yellow]",
-        choices=[str(i) for i in range(10)],
+        choices=_LEVEL_CHOICES,
         default="7"
     ))
     
@@ -0,0 +1,12 @@
+"""
+pytest 公共配置
+
+把 src 目录加入 sys.path (只在 pytest 收集前执行一次)，测试模块无需各自修改路径。
+"""
+
+import sys
+from pathlib import Path
+
+_SRC_DIR = str(Path(__file__).resolve().parents[2])
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
@@ -6,44 +6,59 @@ pytest 测试文件
 
 import pytest
 import tempfile
-import shutil
 import zipfile
 from pathlib import Path
-import sys
-
-# 添加项目路径
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
+from typing import Dict
 
 from repacku.core.zip_compressor import ZipCompressor
 
 
-@pytest.fixture
+# 测试文件内容预先编码为 bytes，写入时不经过 TextIOWrapper 的编码/换行转换
+_FILE1 = b"Test content 1 " * 100  # 增加文件大小
+_FILE2 = b"Test content 2 " * 100  # 增加文件大小
+_SUBFILE1 = b"Subfile 1 " * 50  # 增加文件大小
+_SUBFILE2 = b"Subfile 2 " * 50  # 增加文件大小
+
+# 压缩包中应包含的文件 (不带外层文件夹前缀 / 带外层文件夹前缀)
+_FOLDER_NAME = "TestFolder"
+_EXPECTED_WITHOUT = frozenset({
+    "file1.txt",
+    "file2.txt",
+    "subfolder1/subfile1.txt",
+    "subfolder2/subfile2.txt",
+})
+_EXPECTED_WITH = frozenset(f"{_FOLDER_NAME}/{name}" for name in _EXPECTED_WITHOUT)
+
+
+def _materialize(tree: Dict[Path, bytes]) -> None:
+    """按 {路径: 内容} 创建文件：每个父目录只创建一次 (浅层优先)，每个文件一次 write_bytes"""
+    for parent in sorted({path.parent for path in tree}, key=lambda p: len(p.parts)):
+        parent.mkdir(parents=True, exist_ok=True)
+    for path, data in tree.items():
+        path.write_bytes(data)
+
+
+@pytest.fixture(scope="session")
 def test_folder():
     """
     创建测试文件夹的 fixture
-    """
-    # 创建临时目录
-    temp_dir = Path(tempfile.mkdtemp(prefix="pytest_compress_"))
     
-    # 创建测试文件夹
-    test_folder = temp_dir / "TestFolder"
-    test_folder.mkdir()
-    
-    # 创建子文件夹和文件
-    (test_folder / "subfolder1").mkdir()
-    (test_folder / "subfolder2").mkdir()
-    
-    # 创建测试文件
-    (test_folder / "file1.txt").write_text("Test content 1 " * 100, encoding='utf-8')  # 增加文件大小
-    (test_folder / "file2.txt").write_text("Test content 2 " * 100, encoding='utf-8')  # 增加文件大小
-    (test_folder / "subfolder1" / "subfile1.txt").write_text("Subfile 1 " * 50, encoding='utf-8')  # 增加文件大小
-    (test_folder / "subfolder2" / "subfile2.txt").write_text("Subfile 2 " * 50, encoding='utf-8')  # 增加文件大小
-    
-    yield test_folder
-    
-    # 清理
-    shutil.rmtree(temp_dir)
+    整个测试会话只创建并清理一次；各测试都不删除源文件，压缩包写在测试文件夹旁且文件名互不相同，
+    共用同一份目录树不会相互影响。(压缩包不能放到其他目录: compress_entire_folder 会把
+    既不在父目录也不在文件夹内部的目标路径调整回父目录)
+    """
+    # 临时目录在退出 with 时自动清理
+    with tempfile.TemporaryDirectory(prefix="pytest_compress_") as temp_dir:
+        # 创建测试文件夹、子文件夹和测试文件
+        test_folder = Path(temp_dir) / _FOLDER_NAME
+        _materialize({
+            test_folder / "file1.txt": _FILE1,
+            test_folder / "file2.txt": _FILE2,
+            test_folder / "subfolder1" / "subfile1.txt": _SUBFILE1,
+            test_folder / "subfolder2" / "subfile2.txt": _SUBFILE2,
+        })
+        
+        yield test_folder
 
 
 @pytest.fixture
@@ -54,18 +69,26 @@ def compressor():
     return ZipCompressor(compression_level=5)
 
 
-def test_compress_with_folder_structure(test_folder, compressor):
+@pytest.mark.parametrize(
+    "keep_structure, suffix, expected",
+    [
+        (True, "with_structure", _EXPECTED_WITH),
+        (False, "without_structure", _EXPECTED_WITHOUT),
+    ],
+    ids=["with_structure", "without_structure"],
+)
+def test_compress_folder_structure(test_folder, compressor, keep_structure, suffix, expected):
     """
-    测试保留文件夹结构的压缩
+    测试保留 / 不保留文件夹结构的压缩，并在同一个压缩包上检查压缩率
     """
-    zip_path = test_folder.parent / f"{test_folder.name}_with_structure.zip"
+    zip_path = test_folder.parent / f"{test_folder.name}_{suffix}.zip"
     
     # 执行压缩
     result = compressor.compress_entire_folder(
         folder_path=test_folder,
         target_zip=zip_path,
         delete_source=False,
-        keep_folder_structure=True
+        keep_folder_structure=keep_structure
     )
     
     # 验证结果
@@ -74,86 +97,24 @@ def test_compress_with_folder_structure(test_folder, compressor):
     assert result.original_size > 0, "原始大小应该大于0"
     assert result.compressed_size > 0, "压缩后大小应该大于0"
     
-    # 验证压缩包内容
-    with zipfile.ZipFile(zip_path, 'r') as zf:
-        files = zf.namelist()
-        
-        # 检查是否包含文件夹结构
-        folder_prefix = f"{test_folder.name}/"
-        has_folder_structure = any(f.startswith(folder_prefix) for f in files)
-        assert has_folder_structure, "应该保留文件夹结构"
-        
-        # 检查关键文件是否存在
-        expected_files = [
-            f"{test_folder.name}/file1.txt",
-            f"{test_folder.name}/file2.txt",
-            f"{test_folder.name}/subfolder1/subfile1.txt",
-            f"{test_folder.name}/subfolder2/subfile2.txt"
-        ]
-        
-        for expected_file in expected_files:
-            assert expected_file in files, f"缺少文件: {expected_file}"
-
-
-def test_compress_without_folder_structure(test_folder, compressor):
-    """
-    测试不保留文件夹结构的压缩
-    """
-    zip_path = test_folder.parent / f"{test_folder.name}_without_structure.zip"
-    
-    # 执行压缩
-    result = compressor.compress_entire_folder(
-        folder_path=test_folder,
-        target_zip=zip_path,
-        delete_source=False,
-        keep_folder_structure=False
-    )
-    
-    # 验证结果
-    assert result.success, f"压缩失败: {result.error_message}"
-    assert zip_path.exists(), "压缩包文件不存在"
-    assert result.original_size > 0, "原始大小应该大于0"
-    assert result.compressed_size > 0, "压缩后大小应该大于0"
+    # 压缩率应该在合理范围内
+    compression_ratio = result.compressed_size / result.original_size
+    assert 0.1 < compression_ratio < 1.0, f"压缩率异常: {compression_ratio}"
     
     # 验证压缩包内容
     with zipfile.ZipFile(zip_path, 'r') as zf:
-        files = zf.namelist()
-        
-        # 检查不应该包含外层文件夹结构
-        folder_prefix = f"{test_folder.name}/"
-        has_folder_structure = any(f.startswith(folder_prefix) for f in files)
-        assert not has_folder_structure, "不应该包含外层文件夹结构"
+        files = {info.filename for info in zf.infolist()}
+        top_levels = {name.partition('/')[0] for name in files}
         
-        # 检查关键文件是否存在（不带文件夹前缀）
-        expected_files = [
-            "file1.txt",
-            "file2.txt",
-            "subfolder1/subfile1.txt",
-            "subfolder2/subfile2.txt"
-        ]
+        # 检查外层文件夹结构是否符合预期
+        if keep_structure:
+            assert test_folder.name in top_levels, "应该保留文件夹结构"
+        else:
+            assert test_folder.name not in top_levels, "不应该包含外层文件夹结构"
         
-        for expected_file in expected_files:
-            assert expected_file in files, f"缺少文件: {expected_file}"
-
-
-def test_compression_ratio(test_folder, compressor):
-    """
-    测试压缩率是否合理
-    """
-    zip_path = test_folder.parent / f"{test_folder.name}_ratio_test.zip"
-    
-    result = compressor.compress_entire_folder(
-        folder_path=test_folder,
-        target_zip=zip_path,
-        delete_source=False,
-        keep_folder_structure=True
-    )
-    
-    assert result.success, "压缩应该成功"
-    
-    # 压缩率应该在合理范围内
-    compression_ratio = result.compressed_size / result.original_size
-    assert 0.1 < compression_ratio < 1.0, f"压缩率异常: {compression_ratio}"
+        # 检查关键文件是否存在
+        missing = expected - files
+        assert not missing, f"缺少文件: {sorted(missing)}"
 
 
 def test_invalid_folder_path(compressor):
@@ -195,15 +156,12 @@ def test_both_modes_same_content(test_folder, compressor):
     
     # 验证内容一致性
     with zipfile.ZipFile(zip_with, 'r') as zf1, zipfile.ZipFile(zip_without, 'r') as zf2:
-        files1 = zf1.namelist()
-        files2 = zf2.namelist()
-        
         # 移除路径前缀后，文件列表应该相同
-        folder_name = test_folder.name
-        normalized_files1 = [f.replace(f"{folder_name}/", "") for f in files1 if not f.endswith('/')]
-        normalized_files2 = [f for f in files2 if not f.endswith('/')]
+        prefix = f"{test_folder.name}/"
+        normalized_files1 = {info.filename.removeprefix(prefix) for info in zf1.infolist() if not info.is_dir()}
+        normalized_files2 = {info.filename for info in zf2.infolist() if not info.is_dir()}
         
-        assert set(normalized_files1) == set(normalized_files2), "两种模式的文件内容应该一致"
+        assert normalized_files1 == normalized_files2, "两种模式的文件内容应该一致"
 
 
 if __name__ == "__main__":
@@ -1,12 +1,26 @@
-"""Bootstrap entry: delegate to Typer CLI in repacku.cli"""
+"""Bootstrap entry: delegate to Typer CLI in repacku.cli
 
-from .cli import run
+repacku.cli 会连带导入 Typer/Rich 以及分析、压缩模块，这里延迟到 main() 内部再导入，
+使 `python -m repacku` 的模块加载本身不产生额外开销。
+无参数运行 (例如双击快捷方式) 时先经 cli_lata 尝试启动 lata，成功则完全不加载 Typer；
+失败时告知 cli.run 已经尝试过，CLI 不再重复启动。
+"""
+import sys
 
 
 def main():
-    return run()
+    lata_attempted = False
+    if not [a for a in sys.argv[1:] if a.strip()]:
+        from .cli_lata import try_launch_lata
+
+        if try_launch_lata():
+            return 0
+        lata_attempted = True
+
+    from .cli import run
+
+    return run(lata_attempted=lata_attempted)
 
 
 if __name__ == "__main__":  # pragma: no cover
-    import sys
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -11,89 +11,37 @@
 """
 from __future__ import annotations
 import sys
-import os
 from pathlib import Path
-from typing import Optional, List
-import subprocess
+from typing import Optional, List, TYPE_CHECKING
 import typer
-from rich.console import Console
-from loguru import logger
 
-from repacku.core.folder_analyzer import analyze_folder as do_analyze
-from repacku.core.zip_compressor import ZipCompressor
-from repacku.core.single_packer import SinglePacker
+from repacku.cli_lata import try_launch_lata, clipboard_path
 
-try:
-    import pyperclip  # type: ignore
-except Exception:  # pragma: no cover
-    pyperclip = None
+if TYPE_CHECKING:  # pragma: no cover
+    from rich.console import Console
+
+# Rich / loguru / pyperclip 以及分析、压缩模块都在真正用到时才导入，
+# 使 `repacku --help` 与 lata 启动路径不必加载扫描器和压缩器。
 
 app = typer.Typer(add_completion=False, help="repacku 打包/分析工具 (Typer 版)")
-console = Console()
+_console_instance: Optional["Console"] = None
+
+
+def _console() -> "Console":
+    """延迟创建 Rich Console 单例"""
+    global _console_instance
+    if _console_instance is None:
+        from rich.console import Console
+        _console_instance = Console()
+    return _console_instance
 
 # ------------------ 辅助函数 ------------------
 
-def _try_launch_lata(force: bool = False) -> bool:
-    """尝试启动 lata / 相关 TUI。
-
-    返回 True 表示已经成功启动（本次流程可结束）。
-    返回 False 表示需要继续走 CLI 逻辑。
-    """
-    # 允许用户通过环境变量覆盖命令
-    candidate_cmds: List[str] = []
-    env_cmd = os.environ.get("LATA_CMD")
-    if env_cmd:
-        candidate_cmds.append(env_cmd)
-    candidate_cmds.extend(["lata", "lata.exe", "taskui"])  # 可能的可执行名
-
-    # 定位 Taskfile.yml：优先当前包，再向上查找
-    pkg_dir = Path(__file__).parent
-    search_paths = [pkg_dir, pkg_dir.parent.parent]
-    taskfile_dir: Optional[Path] = None
-    for base in search_paths:
-        tf = base / "Taskfile.yml"
-        if tf.exists():
-            taskfile_dir = base
-            break
-    if not taskfile_dir:
-        if force:
-            console.print("[red]未找到 Taskfile.yml，无法启动 lata。[/red]")
-        return False
-
-    # 逐个尝试候选命令
-    for cmd in candidate_cmds:
-        try:
-            result = subprocess.run(cmd, cwd=taskfile_dir)
-            if result.returncode == 0:
-                logger.info(f"已使用命令 '{cmd}' 启动 TUI (cwd={taskfile_dir})")
-                return True
-            else:
-                logger.debug(f"命令 {cmd} 退出码 {result.returncode}，尝试下一个")
-        except FileNotFoundError:
-            continue
-        except Exception as e:  # pragma: no cover
-            logger.debug(f"启动 {cmd} 异常: {e}")
-            continue
-
-    if force:
-        console.print("[yellow]未找到可用的 lata / taskui 命令，可执行: pip install lata[/yellow]")
-    return False
-
-def _clipboard_path() -> Optional[str]:
-    if not pyperclip:
-        return None
-    try:
-        data = pyperclip.paste().strip()
-    except Exception:
-        return None
-    if not data:
-        return None
-    # 仅取第一行存在的路径
-    for line in data.splitlines():
-        p = line.strip().strip('"').strip("'")
-        if p and os.path.exists(p):
-            return p
-    return None
+# lata 启动与剪贴板读取放在只依赖标准库的 cli_lata 中，供 __main__ 在导入 Typer 前复用
+_try_launch_lata = try_launch_lata
+_clipboard_path = clipboard_path
+# __main__ 在加载 CLI 前已尝试过启动 lata 时置为 True，避免重复启动
+_lata_attempted = False
 
 # ------------------ 核心公共逻辑 ------------------
 
@@ -105,13 +53,16 @@ def _ensure_path(path: Optional[str], clipboard: bool) -> Path:
     if not path:
         raise typer.BadParameter("未提供有效路径，可使用 --path 或 --clipboard")
     p = Path(path)
-    if not p.exists() or not p.is_dir():
+    # is_dir() 对不存在的路径同样返回 False，一次 stat 即可
+    if not p.is_dir():
         raise typer.BadParameter(f"路径无效: {p}")
     return p
 
-def _analyze(path: Path, types: List[str] | None, display: bool) -> Path:
+def _analyze(path: Path, types: List[str] | None, display: bool, use_cache: bool = False) -> Path:
+    from repacku.core.folder_analyzer import analyze_folder as do_analyze
+
     target = types if types else None
-    cfg_path = do_analyze(path, target_file_types=target, display=display)
+    cfg_path = do_analyze(path, target_file_types=target, display=display, use_cache=use_cache)
     return Path(cfg_path)
 
 # ------------------ 命令定义 ------------------
@@ -126,36 +77,39 @@ def main(
     delete_after: bool = typer.Option(False, "--delete-after", "-d", help="压缩成功后删除源"),
     parallel: bool = typer.Option(True, "--parallel/--no-parallel", help="启用/禁用并行压缩"),
     workers: int = typer.Option(None, "--workers", "-w", help="并行工作线程数"),
+    cache: bool = typer.Option(False, "--cache/--no-cache", help="复用上次的目录扫描结果 (目录未变化时)"),
 ) -> None:
     """默认流程: 分析 -> (询问/或自动) 压缩"""
     if ctx.invoked_subcommand is not None:
         return
     raw_args = [a for a in sys.argv[1:] if a.strip()]
     if not raw_args:  # 尝试 lata
-        if _try_launch_lata():
+        if not _lata_attempted and _try_launch_lata():
             raise typer.Exit(0)
         # 若用户既未给 path 又未声明 clipboard，优先给出提示并直接退出而不是报错
         if not path and not clipboard:
-            console.print("[magenta]提示: 未提供路径参数，且未能启动 lata。\n"\
+            _console().print("[magenta]提示: 未提供路径参数，且未能启动 lata。\n"\
                            "请使用 --path / --clipboard 或安装 lata 后直接运行。[/magenta]")
             raise typer.Exit(1)
-        console.print("[cyan]未检测到参数，进入 CLI 模式。[/cyan]")
+        _console().print("[cyan]未检测到参数，进入 CLI 模式。[/cyan]")
 
     p = _ensure_path(path, clipboard)
     type_list = [s.strip() for s in types.split(',')] if types else None
-    console.print(f"[blue]分析路径: {p}\n类型: {type_list or 'ALL'}[/blue]")
-    cfg = _analyze(p, type_list, display=True)
-    console.print(f"[green]分析完成: {cfg}[/green]")
+    _console().print(f"[blue]分析路径: {p}\n类型: {type_list or 'ALL'}[/blue]")
+    cfg = _analyze(p, type_list, display=True, use_cache=cache)
+    _console().print(f"[green]分析完成: {cfg}[/green]")
     if not yes:
         confirm = typer.confirm("是否继续压缩?", default=True)
         if not confirm:
-            console.print("[yellow]已取消压缩步骤。[/yellow]")
+            _console().print("[yellow]已取消压缩步骤。[/yellow]")
             raise typer.Exit(0)
+    from repacku.core.zip_compressor import ZipCompressor
+
     comp = ZipCompressor(parallel_workers=workers) if workers else ZipCompressor()
     results = comp.compress_from_json(cfg, delete_after_success=delete_after, parallel=parallel)
     succ = sum(1 for r in results if r.success)
     fail = len(results) - succ
-    console.print(f"[green]成功: {succ}  失败: {fail}[/green]")
+    _console().print(f"[green]成功: {succ}  失败: {fail}[/green]")
 
 @app.command(help="仅分析，输出 *_config.json")
 def analyze(
@@ -163,11 +117,12 @@ def analyze(
     types: Optional[str] = typer.Option(None, "--types", "-t"),
     clipboard: bool = typer.Option(False, "--clipboard", "-c"),
     no_display: bool = typer.Option(False, "--no-display", help="不展示树形结构"),
+    cache: bool = typer.Option(False, "--cache/--no-cache", help="复用上次的目录扫描结果 (目录未变化时)"),
 ):
     p = _ensure_path(path, clipboard)
     type_list = [s.strip() for s in types.split(',')] if types else None
-    cfg = _analyze(p, type_list, display=not no_display)
-    console.print(f"[green]配置生成: {cfg}")
+    cfg = _analyze(p, type_list, display=not no_display, use_cache=cache)
+    _console().print(f"[green]配置生成: {cfg}")
 
 @app.command(help="分析后立即压缩 (跳过确认)")
 def compress(
@@ -179,13 +134,16 @@ def compress(
     gallery: bool = typer.Option(False, "--gallery", help="以画集模式执行"),
     parallel: bool = typer.Option(True, "--parallel/--no-parallel", help="启用/禁用并行压缩"),
     workers: int = typer.Option(None, "--workers", "-w", help="并行工作线程数"),
+    cache: bool = typer.Option(False, "--cache/--no-cache", help="复用上次的目录扫描结果 (目录未变化时)"),
 ):
     p = _ensure_path(path, clipboard)
 
     # 当指定 single/gallery 时，走 SinglePacker 流程；两者可同时指定，按顺序执行
     if single or gallery:
         if types:
-            console.print("[yellow]提示: 在 --single / --gallery 模式下将忽略 --types 参数。[/yellow]")
+            _console().print("[yellow]提示: 在 --single / --gallery 模式下将忽略 --types 参数。[/yellow]")
+        from repacku.core.single_packer import SinglePacker
+
         packer = SinglePacker()
         if gallery:
             packer.process_gallery_folders(str(p), delete_after=delete_after)
@@ -195,7 +153,9 @@ def compress(
 
     # 常规 analyze+compress 流程
     type_list = [s.strip() for s in types.split(',')] if types else None
-    cfg = _analyze(p, type_list, display=True)
+    cfg = _analyze(p, type_list, display=True, use_cache=cache)
+    from repacku.core.zip_compressor import ZipCompressor
+
     comp = ZipCompressor(parallel_workers=workers) if workers else ZipCompressor()
     comp.compress_from_json(cfg, delete_after_success=delete_after, parallel=parallel)
 
@@ -205,6 +165,8 @@ def single_pack(
     clipboard: bool = typer.Option(False, "--clipboard", "-c"),
     delete_after: bool = typer.Option(False, "--delete-after", "-d"),
 ):
+    from repacku.core.single_packer import SinglePacker
+
     p = _ensure_path(path, clipboard)
     packer = SinglePacker()
     packer.pack_directory(str(p), delete_after=delete_after)
@@ -215,6 +177,8 @@ def gallery_pack(
     clipboard: bool = typer.Option(False, "--clipboard", "-c"),
     delete_after: bool = typer.Option(False, "--delete-after", "-d"),
 ):
+    from repacku.core.single_packer import SinglePacker
+
     p = _ensure_path(path, clipboard)
     packer = SinglePacker()
     packer.process_gallery_folders(str(p), delete_after=delete_after)
@@ -231,11 +195,11 @@ def benchmark(
     from repacku.core.folder_analyzer import FolderAnalyzer
     
     p = _ensure_path(path, clipboard)
-    console.print(f"[blue]性能测试路径: {p}[/blue]")
-    console.print(f"[blue]迭代次数: {iterations}[/blue]\n")
+    _console().print(f"[blue]性能测试路径: {p}[/blue]")
+    _console().print(f"[blue]迭代次数: {iterations}[/blue]\n")
     
     # 测试标准扫描器
-    console.print("[yellow]测试标准扫描器...[/yellow]")
+    _console().print("[yellow]测试标准扫描器...[/yellow]")
     standard_times = []
     for i in range(iterations):
         start = time.perf_counter()
@@ -243,11 +207,11 @@ def benchmark(
         analyzer.analyze_folder_structure(p, use_fast_scanner=False)
         elapsed = time.perf_counter() - start
         standard_times.append(elapsed)
-        console.print(f"  第 {i+1} 次: {elapsed:.3f}s")
+        _console().print(f"  第 {i+1} 次: {elapsed:.3f}s")
     avg_standard = sum(standard_times) / len(standard_times)
     
     # 测试快速扫描器
-    console.print("\n[yellow]测试快速扫描器...[/yellow]")
+    _console().print("\n[yellow]测试快速扫描器...[/yellow]")
     try:
         from repacku.core.fast_scanner import FastScanner
         fast_times = []
@@ -257,22 +221,25 @@ def benchmark(
             analyzer.analyze_folder_structure(p, use_fast_scanner=True)
             elapsed = time.perf_counter() - start
             fast_times.append(elapsed)
-            console.print(f"  第 {i+1} 次: {elapsed:.3f}s")
+            _console().print(f"  第 {i+1} 次: {elapsed:.3f}s")
         avg_fast = sum(fast_times) / len(fast_times)
         
         # 输出结果
-        console.print("\n[green]===== 结果 =====[/green]")
-        console.print(f"标准扫描器平均: {avg_standard:.3f}s")
-        console.print(f"快速扫描器平均: {avg_fast:.3f}s")
+        _console().print("\n[green]===== 结果 =====[/green]")
+        _console().print(f"标准扫描器平均: {avg_standard:.3f}s")
+        _console().print(f"快速扫描器平均: {avg_fast:.3f}s")
         speedup = avg_standard / avg_fast if avg_fast > 0 else 0
-        console.print(f"[bold green]加速比: {speedup:.2f}x[/bold green]")
+        _console().print(f"[bold green]加速比: {speedup:.2f}x[/bold green]")
     except ImportError:
-        console.print("[red]快速扫描器不可用[/red]")
-        console.print(f"\n标准扫描器平均: {avg_standard:.3f}s")
+        _console().print("[red]快速扫描器不可用[/red]")
+        _console().print(f"\n标准扫描器平均: {avg_standard:.3f}s")
 
 # 外部调用入口
 
-def run():  # pragma: no cover
+def run(lata_attempted: bool = False):  # pragma: no cover
+    """运行 Typer 应用；lata_attempted 表示调用方已尝试过启动 lata (且未成功)"""
+    global _lata_attempted
+    _lata_attempted = lata_attempted
     app()
 
 if __name__ == "__main__":  # pragma: no cover
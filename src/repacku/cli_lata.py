@@ -0,0 +1,83 @@
+"""无参数启动路径: lata (Taskfile UI) 与剪贴板路径读取
+
+本模块导入时只依赖标准库 (os / pathlib / subprocess)，不导入 Typer、Rich、loguru
+(loguru 仅在实际运行过候选命令后才按需导入，用于记录启动结果)，
+`repacku` 无参数运行时可在加载完整 CLI 之前直接启动 lata。
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def try_launch_lata(force: bool = False) -> bool:
+    """尝试启动 lata / 相关 TUI。
+
+    返回 True 表示已经成功启动（本次流程可结束）。
+    返回 False 表示需要继续走 CLI 逻辑。
+    """
+    # 允许用户通过环境变量覆盖命令
+    candidate_cmds: List[str] = []
+    env_cmd = os.environ.get("LATA_CMD")
+    if env_cmd:
+        candidate_cmds.append(env_cmd)
+    candidate_cmds.extend(["lata", "lata.exe", "taskui"])  # 可能的可执行名
+
+    # 定位 Taskfile.yml：优先当前包，再向上查找
+    pkg_dir = Path(__file__).parent
+    search_paths = [pkg_dir, pkg_dir.parent.parent]
+    taskfile_dir: Optional[Path] = None
+    for base in search_paths:
+        tf = base / "Taskfile.yml"
+        if tf.exists():
+            taskfile_dir = base
+            break
+    if not taskfile_dir:
+        if force:
+            print("未找到 Taskfile.yml，无法启动 lata。", file=sys.stderr)
+        return False
+
+    # 逐个尝试候选命令
+    for cmd in candidate_cmds:
+        try:
+            result = subprocess.run(cmd, cwd=taskfile_dir)
+            # loguru 只在这里按需导入，保持本模块的导入开销只有标准库
+            from loguru import logger
+            if result.returncode == 0:
+                logger.info(f"已使用命令 '{cmd}' 启动 TUI (cwd={taskfile_dir})")
+                return True
+            else:
+                logger.debug(f"命令 {cmd} 退出码 {result.returncode}，尝试下一个")
+        except FileNotFoundError:
+            continue
+        except Exception as e:  # pragma: no cover
+            from loguru import logger
+            logger.debug(f"启动 {cmd} 异常: {e}")
+            continue
+
+    if force:
+        print("未找到可用的 lata / taskui 命令，可执行: pip install lata", file=sys.stderr)
+    return False
+
+
+def clipboard_path() -> Optional[str]:
+    """从剪贴板取第一行存在的路径，pyperclip 不可用时返回 None"""
+    try:
+        import pyperclip  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    try:
+        data = pyperclip.paste().strip()
+    except Exception:
+        return None
+    if not data:
+        return None
+    # 仅取第一行存在的路径
+    for line in data.splitlines():
+        p = line.strip().strip('"').strip("'")
+        if p and os.path.exists(p):
+            return p
+    return None
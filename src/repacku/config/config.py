@@ -3,14 +3,23 @@
 配置相关工具函数：统一从 compression_config.json 读取配置
 """
 import json
+from functools import lru_cache
 from pathlib import Path
 
 _CONFIG_PATH = Path(__file__).parent / "compression_config.json"
 
-def get_config():
+@lru_cache(maxsize=1)
+def _load_config(mtime_ns: int):
     with open(_CONFIG_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def get_config():
+    """返回解析后的配置；按文件 mtime 缓存，文件被修改后自动重新读取。
+
+    返回的字典在调用方之间共享，请勿原地修改。
+    """
+    return _load_config(_CONFIG_PATH.stat().st_mtime_ns)
+
 def get_compression_level():
     cfg = get_config()
     return cfg.get("compression", {}).get("level", 5)
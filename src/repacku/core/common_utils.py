@@ -6,9 +6,19 @@
 
 import os
 import json
+import shelve
+import logging
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Any, Optional, Union
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
 
 def _load_file_types_from_config() -> Dict[str, Set[str]]:
     """
@@ -77,6 +87,61 @@ COMPRESS_MODE_SELECTIVE = "selective"  # 选择性压缩文件
 COMPRESS_MODE_SKIP = "skip"  # 跳过不处理
 
 # 文件工具函数
+def _current_umask() -> int:
+    """读取当前进程的 umask (os.umask 只能设置并返回旧值，读取后立即还原)"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 导入时读取一次：os.umask 的读取需要临时修改进程状态，不宜在多线程写文件时反复调用
+_UMASK = _current_umask()
+
+
+def write_json_atomic(path: Union[str, Path], data: Any) -> None:
+    """
+    以 UTF-8、2 空格缩进写出 JSON，先写临时文件再替换，避免中途失败留下半截文件
+    
+    有 orjson 时用其直接编码为 bytes，否则回退到标准库 json (ensure_ascii=False)。
+    mkstemp 创建的临时文件权限为 0600，替换前改为目标原有权限 (不存在时按 0666 & ~umask)，
+    与直接 open(path, 'w') 写出的文件一致。
+    """
+    path = Path(path)
+    payload = None
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            payload = None
+    if payload is None:
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """读取 JSON 文件，有 orjson 时直接解析 bytes"""
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
 def safe_path(path: Path) -> str:
     """
     安全处理路径字符串，避免UNC路径问题
@@ -99,7 +164,12 @@ def is_blacklisted_path(path: Path) -> bool:
     Returns:
         bool: 如果路径包含黑名单关键词则返回True
     """
-    path_str = str(path).lower()
+    return _is_blacklisted_str(str(path))
+
+@lru_cache(maxsize=8192)
+def _is_blacklisted_str(path_str: str) -> bool:
+    """按路径字符串缓存黑名单判断结果 (黑名单关键词在运行期间不变)"""
+    path_str = path_str.lower()
     return any(keyword.lower() in path_str for keyword in BLACKLIST_KEYWORDS)
 
 def get_folder_size(folder_path: Path) -> int:
@@ -112,12 +182,24 @@ def get_folder_size(folder_path: Path) -> int:
     Returns:
         int: 文件夹总大小（字节）
     """
+    # 显式栈 + os.scandir：类型与大小取自 DirEntry，不再逐个文件 join 后 isfile/islink/getsize；
+    # 只统计普通文件，不进入也不统计符号链接，无法读取的目录直接跳过
     total_size = 0
-    for dirpath, _, filenames in os.walk(folder_path):
-        for filename in filenames:
-            file_path = os.path.join(dirpath, filename)
-            if os.path.isfile(file_path) and not os.path.islink(file_path):
-                total_size += os.path.getsize(file_path)
+    stack = [os.fspath(folder_path)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
     return total_size
 
 def compare_zip_contents(source_folder: Path, zip_file: Path) -> bool:
@@ -379,4 +461,67 @@ class CompressionStats:
                 f"失败: {self.failed_compressions}, 成功率: {success_rate:.1f}%\n"
                 f"总原始大小: {self.total_original_size/1024/1024:.2f}MB, "
                 f"总压缩后大小: {self.total_compressed_size/1024/1024:.2f}MB, "
-                f"总体压缩率: {compression_ratio:.1f}%")
\ No newline at end of file
+                f"总体压缩率: {compression_ratio:.1f}%")
+
+class ScanCache:
+    """扫描结果缓存 (shelve 持久化)
+
+    以字符串键保存 (目录 mtime_ns, 结果)。目录的 mtime 只在其直接条目增删改名时变化，
+    因此只适合缓存"单层目录条目"这类结果；文件内容/大小变化不会使缓存失效。
+    打开失败时自动禁用，get 始终返回 None，不影响正常扫描。
+    """
+
+    DEFAULT_PATH = Path.home() / ".cache" / "repacku" / "scan_cache"
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._db = None
+        self._disabled = False
+
+    def _get_db(self):
+        if self._db is None and not self._disabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = shelve.open(str(self.path))
+            except Exception as e:
+                logging.warning(f"无法打开扫描缓存 {self.path}: {e}")
+                self._disabled = True
+        return self._db
+
+    def get(self, key: str, mtime_ns: int) -> Any:
+        """mtime 一致时返回缓存结果，否则返回 None"""
+        with self._lock:
+            db = self._get_db()
+            if db is None:
+                return None
+            try:
+                entry = db.get(key)
+            except Exception:
+                return None
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1]
+        return None
+
+    def put(self, key: str, mtime_ns: int, value: Any) -> None:
+        """写入缓存 (同一键的旧条目直接覆盖)"""
+        with self._lock:
+            db = self._get_db()
+            if db is None:
+                return
+            try:
+                db[key] = (mtime_ns, value)
+            except Exception as e:
+                logging.debug(f"写入扫描缓存失败: {key}, {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self) -> "ScanCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -11,25 +11,27 @@
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple, Iterator, Any, Callable
-from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
 import logging
 
-# 尝试导入高性能库
-try:
-    import scandir_rs
-    HAS_SCANDIR_RS = True
-except ImportError:
-    HAS_SCANDIR_RS = False
+# scandir-rs 为可选依赖，首次创建扫描器时才探测导入
+scandir_rs = None
 
-try:
-    from joblib import Parallel, delayed
-    HAS_JOBLIB = True
-except ImportError:
-    HAS_JOBLIB = False
+
+@lru_cache(maxsize=1)
+def _has_scandir_rs() -> bool:
+    """探测 scandir-rs 是否可用 (结果缓存，只导入一次)"""
+    global scandir_rs
+    try:
+        import scandir_rs as _scandir_rs
+    except ImportError:
+        return False
+    scandir_rs = _scandir_rs
+    return True
 
 # Rich 进度条
 from rich.console import Console
@@ -41,35 +43,152 @@ from rich.progress import (
 from repacku.core.common_utils import (
     DEFAULT_FILE_TYPES, BLACKLIST_KEYWORDS,
     COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE, COMPRESS_MODE_SKIP,
-    FileTypeManager, is_blacklisted_path
+    ScanCache
 )
 
 console = Console()
 
 
 # 预编译扩展名到类型的映射 (反向索引，加速查找)
-_EXT_TO_TYPE_CACHE: Dict[str, str] = {}
-
-def _build_ext_cache():
-    """构建扩展名到类型的缓存映射"""
-    global _EXT_TO_TYPE_CACHE
-    if _EXT_TO_TYPE_CACHE:
-        return
-    for type_name, extensions in DEFAULT_FILE_TYPES.items():
-        for ext in extensions:
-            _EXT_TO_TYPE_CACHE[ext] = type_name
-
-_build_ext_cache()
+_EXT_TO_TYPE_CACHE: Dict[str, str] = {
+    ext.lower(): type_name
+    for type_name, extensions in DEFAULT_FILE_TYPES.items()
+    for ext in extensions
+}
 
 
+@lru_cache(maxsize=512)
 def fast_get_file_type(ext: str) -> Optional[str]:
     """快速获取文件类型 (使用缓存)"""
     return _EXT_TO_TYPE_CACHE.get(ext.lower())
 
 
-@dataclass
+def _ext_of(name: str) -> str:
+    """取文件名的小写扩展名，语义与 Path(name).suffix.lower() 一致但不构造 Path 对象"""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ''
+
+
+# 黑名单关键词集合 (小写)，用于目录名的哈希查找
+_BLACKLIST_NAMES = frozenset(kw.lower() for kw in BLACKLIST_KEYWORDS)
+
+
+@lru_cache(maxsize=4096)
+def _is_blacklisted_name(name: str) -> bool:
+    """检查目录名是否在黑名单中 (只检查目录名，不检查完整路径)
+
+    完全匹配关键词，或以 "关键词." 开头时视为黑名单。
+    关键词本身可能以点开头 (如 .git)，因此逐个点位置截取前缀查集合。
+    """
+    name_lower = name.lower()
+    if name_lower in _BLACKLIST_NAMES:
+        return True
+    dot = name_lower.find('.', 1)
+    while dot != -1:
+        if name_lower[:dot] in _BLACKLIST_NAMES:
+            return True
+        dot = name_lower.find('.', dot + 1)
+    return False
+
+
+@lru_cache(maxsize=64)
+def _target_ext_set(target_types: Tuple[str, ...]) -> frozenset:
+    """目标类型包含的全部扩展名"""
+    exts = set()
+    for t in target_types:
+        exts.update(DEFAULT_FILE_TYPES.get(t, ()))
+    return frozenset(exts)
+
+
+def _classify_entries(entries: Iterator[os.DirEntry],
+                      target_types: List[str] = None,
+                      calc_size: bool = False
+                      ) -> Tuple[List[Tuple[str, str, int]], List[str], Dict[str, int], Dict[str, int], int]:
+    """
+    单层目录条目分类 (扫描热循环)
+    
+    Returns:
+        (files_data, subdirs, file_types, file_extensions, total_size)
+    """
+    file_types: Dict[str, int] = {}
+    file_exts: Dict[str, int] = {}
+    files_data = []
+    subdirs = []
+    total_size = 0
+    
+    # 目标类型对应的扩展名集合 (同一组目标类型只构建一次)
+    target_exts = _target_ext_set(tuple(target_types)) if target_types else None
+    
+    # 热循环内频繁调用的函数绑定为局部变量
+    ext_of = _ext_of
+    get_type = fast_get_file_type
+    is_blacklisted = _is_blacklisted_name
+    add_file = files_data.append
+    add_dir = subdirs.append
+    
+    for entry in entries:
+        try:
+            if entry.is_file(follow_symlinks=False):
+                name = entry.name
+                ext = ext_of(name)
+                size = entry.stat().st_size if calc_size else 0
+                add_file((name, ext, size))
+                total_size += size
+                
+                # 快速类型查找
+                ftype = get_type(ext)
+                if ftype:
+                    file_types[ftype] = file_types.get(ftype, 0) + 1
+                
+                # 只有当没有指定目标类型，或者扩展名属于目标类型之一时，才记录扩展名
+                should_record_ext = target_exts is None or ext in target_exts
+                
+                if should_record_ext and ext:
+                    file_exts[ext] = file_exts.get(ext, 0) + 1
+                    
+            elif entry.is_dir(follow_symlinks=False):
+                if not is_blacklisted(entry.name):
+                    add_dir(entry.path)
+        except (OSError, PermissionError):
+            continue
+    
+    return files_data, subdirs, file_types, file_exts, total_size
+
+
+def _classify_names(filenames: List[str],
+                    target_types: List[str] = None
+                    ) -> Tuple[List[Tuple[str, str, int]], Dict[str, int], Dict[str, int]]:
+    """
+    按文件名列表统计类型与扩展名 (用于已由 walk 给出文件名、不需要 DirEntry 的场景)
+    
+    Returns:
+        (files_data, file_types, file_extensions)，大小均记为 0
+    """
+    file_types: Dict[str, int] = {}
+    file_exts: Dict[str, int] = {}
+    target_exts = _target_ext_set(tuple(target_types)) if target_types else None
+    ext_of = _ext_of
+    get_type = fast_get_file_type
+    files_data = []
+    add_file = files_data.append
+    
+    for name in filenames:
+        ext = ext_of(name)
+        add_file((name, ext, 0))
+        ftype = get_type(ext)
+        if ftype:
+            file_types[ftype] = file_types.get(ftype, 0) + 1
+        if ext and (target_exts is None or ext in target_exts):
+            file_exts[ext] = file_exts.get(ext, 0) + 1
+    
+    return files_data, file_types, file_exts
+
+
+@dataclass(slots=True)
 class ScanResult:
-    """扫描结果数据类"""
+    """扫描结果数据类 (slots: 大目录树会同时持有大量实例)"""
     path: str
     name: str
     depth: int
@@ -84,73 +203,25 @@ class ScanResult:
 class FastScanner:
     """高性能文件夹扫描器"""
     
-    def __init__(self, max_workers: int = None, use_rust: bool = True):
+    def __init__(self, max_workers: int = None, use_rust: bool = True,
+                 use_processes: bool = False, cache: Optional[ScanCache] = None):
         """
         初始化扫描器
         
         Args:
             max_workers: 最大工作线程数，默认为 CPU 核心数 * 2
             use_rust: 是否使用 Rust 实现的 scandir (如果可用)
+            use_processes: 大目录树 (>= 500 个目录) 时使用多进程扫描，绕开 GIL
+            cache: 单目录扫描结果缓存 (按目录 mtime 失效)，None 表示不使用缓存
         """
         self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
-        self.use_rust = use_rust and HAS_SCANDIR_RS
-        self._file_type_manager = FileTypeManager()
-        
-    def scan_directory_fast(self, root_path: Path) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
-        """
-        快速扫描目录，返回 (目录路径, 文件列表, 子目录列表)
-        
-        使用 scandir-rs 或 os.scandir 进行高效扫描
-        """
-        if self.use_rust:
-            yield from self._scan_with_rust(root_path)
-        else:
-            yield from self._scan_with_os(root_path)
-    
-    def _scan_with_rust(self, root_path: Path) -> Iterator[Tuple[str, List, List]]:
-        """使用 scandir-rs 进行扫描"""
-        try:
-            # scandir_rs.walk 返回类似 os.walk 的结果
-            for dirpath, dirnames, filenames in scandir_rs.walk(str(root_path)):
-                # 过滤黑名单目录
-                dirnames[:] = [d for d in dirnames if not self._is_blacklisted_name(d)]
-                yield dirpath, filenames, dirnames
-        except Exception as e:
-            logging.warning(f"scandir-rs 扫描失败，回退到 os.scandir: {e}")
-            yield from self._scan_with_os(root_path)
-    
-    def _scan_with_os(self, root_path: Path) -> Iterator[Tuple[str, List, List]]:
-        """使用 os.scandir 进行扫描 (优化版)"""
-        try:
-            entries = list(os.scandir(root_path))
-        except (OSError, PermissionError) as e:
-            logging.warning(f"无法扫描目录 {root_path}: {e}")
-            return
+        self.use_rust = use_rust and _has_scandir_rs()
+        self.use_processes = use_processes
+        self.cache = cache
         
-        files = []
-        dirs = []
-        
-        for entry in entries:
-            try:
-                if entry.is_file(follow_symlinks=False):
-                    files.append(entry)
-                elif entry.is_dir(follow_symlinks=False):
-                    if not self._is_blacklisted_name(entry.name):
-                        dirs.append(entry)
-            except (OSError, PermissionError):
-                continue
-        
-        yield str(root_path), files, dirs
-    
     def _is_blacklisted_name(self, name: str) -> bool:
-        """检查目录名是否在黑名单中 (只检查目录名，不检查完整路径)"""
-        name_lower = name.lower()
-        # 只有完全匹配或以黑名单关键词开头才过滤
-        for kw in BLACKLIST_KEYWORDS:
-            kw_lower = kw.lower()
-            if name_lower == kw_lower or name_lower.startswith(kw_lower + '.'):
-                return True
-        return False
+        """检查目录名是否在黑名单中 (委托给模块级缓存函数)"""
+        return _is_blacklisted_name(name)
     
     def scan_single_folder(self, folder_path: Path, 
                           target_types: List[str] = None,
@@ -162,7 +233,31 @@ class FastScanner:
             folder_path: 文件夹路径
             target_types: 目标文件类型
             calc_size: 是否计算文件大小 (关闭可提升速度)
+        
+        启用缓存时，目录 mtime 未变化则直接返回上次的结果。
+        计算大小时不走缓存：文件内容变化不会改变目录 mtime。
         """
+        if self.cache is None or calc_size:
+            return self._scan_single_folder(folder_path, target_types, calc_size)
+        
+        try:
+            mtime_ns = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return self._scan_single_folder(folder_path, target_types, calc_size)
+        
+        key = f"{folder_path}|{','.join(sorted(target_types)) if target_types else ''}"
+        cached = self.cache.get(key, mtime_ns)
+        if cached is not None:
+            return cached
+        
+        result = self._scan_single_folder(folder_path, target_types, calc_size)
+        self.cache.put(key, mtime_ns, result)
+        return result
+    
+    def _scan_single_folder(self, folder_path: Path,
+                            target_types: List[str] = None,
+                            calc_size: bool = False) -> ScanResult:
+        """扫描单个文件夹 (不递归，不经过缓存)"""
         result = ScanResult(
             path=str(folder_path),
             name=folder_path.name,
@@ -179,52 +274,14 @@ class FastScanner:
             logging.warning(f"无法扫描 {folder_path}: {e}")
             return result
         
-        file_types = Counter()
-        file_exts = Counter()
-        files_data = []
-        subdirs = []
-        total_size = 0
-        
-        for entry in entries:
-            try:
-                if entry.is_file(follow_symlinks=False):
-                    ext = Path(entry.name).suffix.lower()
-                    size = entry.stat().st_size if calc_size else 0
-                    files_data.append((entry.name, ext, size))
-                    total_size += size
-                    
-                    # 快速类型查找
-                    ftype = fast_get_file_type(ext)
-                    if ftype:
-                        file_types[ftype] += 1
-                    
-                    # 只有当没有指定目标类型，或者扩展名属于目标类型之一时，才记录扩展名
-                    should_record_ext = False
-                    if not target_types:
-                        should_record_ext = True
-                    else:
-                        if ftype in target_types:
-                            should_record_ext = True
-                        else:
-                            # 即使ftype没找到，如果扩展名在这些类型的集合中也应该记录
-                            for t in target_types:
-                                if t in DEFAULT_FILE_TYPES and ext in DEFAULT_FILE_TYPES[t]:
-                                    should_record_ext = True
-                                    break
-                    
-                    if should_record_ext and ext:
-                        file_exts[ext] += 1
-                        
-                elif entry.is_dir(follow_symlinks=False):
-                    if not self._is_blacklisted_name(entry.name):
-                        subdirs.append(entry.path)
-            except (OSError, PermissionError):
-                continue
+        files_data, subdirs, file_types, file_exts, total_size = _classify_entries(
+            entries, target_types, calc_size
+        )
         
         result.files = files_data
         result.subdirs = subdirs
-        result.file_types = dict(file_types)
-        result.file_extensions = dict(file_exts)
+        result.file_types = file_types
+        result.file_extensions = file_exts
         result.total_files = len(files_data)
         result.total_size = total_size
         
@@ -249,17 +306,20 @@ class FastScanner:
         """
         results: Dict[str, ScanResult] = {}
         
-        # 第一阶段：收集所有目录
         if show_progress:
             # 显示快速扫描启用状态
             status_parts = ["[cyan]⚡ 快速扫描模式[/cyan]"]
             if self.use_rust:
                 status_parts.append("[green]scandir-rs ✓[/green]")
-            if HAS_JOBLIB:
-                status_parts.append("[green]joblib ✓[/green]")
             status_parts.append(f"[dim]线程数: {self.max_workers}[/dim]")
             console.print(" | ".join(status_parts))
-            
+        
+        # 不计算大小时，单次遍历即可同时得到目录列表和扫描结果
+        if not calc_size and not self.use_processes:
+            return self._scan_tree_walk(root_path, target_types, show_progress)
+        
+        # 第一阶段：收集所有目录
+        if show_progress:
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[cyan]收集目录..."),
@@ -274,6 +334,41 @@ class FastScanner:
         total_dirs = len(all_dirs)
         
         # 第二阶段：并行扫描所有目录
+        if self.use_processes and total_dirs >= _PROCESS_MIN_DIRS:
+            if show_progress:
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[bold blue]{task.description}"),
+                    BarColumn(bar_width=30),
+                    MofNCompleteColumn(),
+                    TextColumn("•"),
+                    TimeElapsedColumn(),
+                    console=console
+                ) as progress:
+                    task = progress.add_task(f"扫描 {total_dirs} 个目录 (多进程)", total=total_dirs)
+                    self._scan_dirs_in_processes(
+                        all_dirs, target_types, calc_size, results,
+                        lambda n: progress.advance(task, n)
+                    )
+            else:
+                self._scan_dirs_in_processes(all_dirs, target_types, calc_size, results)
+            return results
+        
+        def scan_dir(d: str) -> Optional[ScanResult]:
+            try:
+                return self.scan_single_folder(Path(d), target_types, calc_size)
+            except Exception as e:
+                logging.warning(f"扫描失败: {d}, {e}")
+                return None
+        
+        def run(on_scanned: Callable[[], None] = None):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for res in executor.map(scan_dir, all_dirs):
+                    if res is not None:
+                        results[res.path] = res
+                    if on_scanned:
+                        on_scanned()
+        
         if show_progress:
             with Progress(
                 SpinnerColumn(),
@@ -285,55 +380,129 @@ class FastScanner:
                 console=console
             ) as progress:
                 task = progress.add_task(f"扫描 {total_dirs} 个目录", total=total_dirs)
-                
-                if HAS_JOBLIB and total_dirs > 100:
-                    # joblib 不支持细粒度进度，一次性更新
-                    scan_results = Parallel(n_jobs=self.max_workers, prefer="threads")(
-                        delayed(self.scan_single_folder)(Path(d), target_types, calc_size)
-                        for d in all_dirs
-                    )
-                    for res in scan_results:
-                        results[res.path] = res
-                    progress.update(task, completed=total_dirs)
-                else:
-                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                        futures = {
-                            executor.submit(self.scan_single_folder, Path(d), target_types, calc_size): d
-                            for d in all_dirs
-                        }
-                        for future in as_completed(futures):
-                            try:
-                                res = future.result()
-                                results[res.path] = res
-                            except Exception as e:
-                                logging.warning(f"扫描失败: {futures[future]}, {e}")
-                            progress.advance(task)
+                run(lambda: progress.advance(task))
         else:
-            # 无进度条模式
-            if HAS_JOBLIB and total_dirs > 100:
-                scan_results = Parallel(n_jobs=self.max_workers, prefer="threads")(
-                    delayed(self.scan_single_folder)(Path(d), target_types, calc_size)
-                    for d in all_dirs
-                )
-                for res in scan_results:
-                    results[res.path] = res
-            else:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {
-                        executor.submit(self.scan_single_folder, Path(d), target_types, calc_size): d
-                        for d in all_dirs
-                    }
-                    for future in as_completed(futures):
-                        try:
-                            res = future.result()
-                            results[res.path] = res
-                        except Exception as e:
-                            logging.warning(f"扫描失败: {futures[future]}, {e}")
+            run()
         
         return results
+    
+    def _scan_dirs_in_processes(self, all_dirs: List[str],
+                                target_types: List[str],
+                                calc_size: bool,
+                                results: Dict[str, ScanResult],
+                                on_done: Callable[[int], None] = None) -> None:
+        """使用进程池按块扫描目录，结果写入 results"""
+        chunks = [all_dirs[i:i + _PROCESS_CHUNK_SIZE]
+                  for i in range(0, len(all_dirs), _PROCESS_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 initializer=_worker_init) as executor:
+            futures = {
+                executor.submit(_scan_chunk, chunk, target_types, calc_size): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    for res in future.result():
+                        results[res.path] = res
+                except Exception as e:
+                    logging.warning(f"扫描失败: {chunk[0]} 等 {len(chunk)} 个目录, {e}")
+                if on_done:
+                    on_done(len(chunk))
+    
+    def _scan_tree_walk(self, root_path: Path,
+                        target_types: List[str] = None,
+                        show_progress: bool = True) -> Dict[str, ScanResult]:
+        """
+        单次遍历扫描整个目录树 (不计算大小)
+        
+        有 scandir-rs 时直接用它返回的文件名/子目录名构建结果；否则逐目录 os.scandir，
+        每个目录只读取一次：结果里已带有过滤后的子目录，直接压栈继续遍历，
+        不再先收集目录再逐个重新扫描。逐目录工作只是条目迭代，线程池带不来收益。
+        启用扫描缓存时不走 scandir-rs：缓存的读取与写入都在 scan_single_folder 中完成。
+        """
+        results: Dict[str, ScanResult] = {}
+        
+        def collect(scans: Iterator[ScanResult], on_scanned: Callable[[], None] = None):
+            for res in scans:
+                results[res.path] = res
+                if on_scanned:
+                    on_scanned()
+        
+        def walk(on_scanned: Callable[[], None] = None, on_restart: Callable[[], None] = None):
+            if self.use_rust and self.cache is None:
+                try:
+                    collect(self._iter_scan_rust(root_path, target_types), on_scanned)
+                    return
+                except Exception as e:
+                    logging.warning(f"scandir-rs 扫描失败，回退到 os.scandir: {e}")
+                    # 丢弃中途失败前已产出的部分结果，计数从头开始
+                    results.clear()
+                    if on_restart:
+                        on_restart()
+            collect(self._iter_scan_os(root_path, target_types), on_scanned)
+        
+        if show_progress:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]扫描目录"),
+                TextColumn("{task.completed} 个"),
+                TextColumn("•"),
+                TimeElapsedColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task("scanning", total=None)
+                walk(lambda: progress.advance(task), lambda: progress.reset(task))
+        else:
+            walk()
         
         return results
     
+    def _iter_scan_os(self, root_path: Path,
+                      target_types: List[str] = None) -> Iterator[ScanResult]:
+        """基于 os.scandir 的深度优先遍历，逐目录产出扫描结果"""
+        stack = [root_path]
+        while stack:
+            res = self.scan_single_folder(stack.pop(), target_types, False)
+            stack.extend(Path(d) for d in reversed(res.subdirs))
+            yield res
+    
+    def _iter_scan_rust(self, root_path: Path,
+                        target_types: List[str] = None) -> Iterator[ScanResult]:
+        """
+        基于 scandir-rs walk 的遍历，直接用其返回的名称构建扫描结果
+        
+        只接受根目录以及已接受目录中未被黑名单过滤的子目录，
+        因此不依赖 walk 是否遵守 dirnames 的原地裁剪。
+        """
+        root = str(root_path)
+        if _is_blacklisted_name(root_path.name):
+            yield ScanResult(path=root, name=root_path.name, depth=len(root_path.parts))
+            return
+        
+        accepted = {os.path.normpath(root): root}
+        for dirpath, dirnames, filenames in scandir_rs.walk(root):
+            path = accepted.pop(os.path.normpath(dirpath), None)
+            if path is None:
+                continue
+            
+            dirnames[:] = [d for d in dirnames if not _is_blacklisted_name(d)]
+            subdirs = [os.path.join(path, d) for d in dirnames]
+            for sub in subdirs:
+                accepted[os.path.normpath(sub)] = sub
+            
+            files_data, file_types, file_exts = _classify_names(filenames, target_types)
+            yield ScanResult(
+                path=path,
+                name=os.path.basename(path) or path,
+                depth=len(Path(path).parts),
+                files=files_data,
+                subdirs=subdirs,
+                file_types=file_types,
+                file_extensions=file_exts,
+                total_files=len(files_data),
+            )
+    
     def _collect_all_dirs(self, root_path: Path) -> List[str]:
         """快速收集所有目录路径"""
         dirs = [str(root_path)]
@@ -360,12 +529,33 @@ class FastScanner:
         return dirs
 
 
+# 多进程扫描: 目录数达到阈值才启用，每次提交一块目录以摊薄进程间通信开销
+_PROCESS_MIN_DIRS = 500
+_PROCESS_CHUNK_SIZE = 64
+
+_worker_scanner: Optional[FastScanner] = None
+
+
+def _worker_init() -> None:
+    """进程池 worker 初始化：每个进程只创建一次扫描器"""
+    global _worker_scanner
+    _worker_scanner = FastScanner(max_workers=1)
+
+
+def _scan_chunk(dirs: List[str], target_types: List[str],
+                calc_size: bool) -> List[ScanResult]:
+    """在 worker 进程中扫描一块目录 (模块级函数，便于 pickle)"""
+    scanner = _worker_scanner or FastScanner(max_workers=1)
+    return [scanner.scan_single_folder(Path(d), target_types, calc_size) for d in dirs]
+
+
 class FastFolderAnalyzer:
     """高性能文件夹分析器 (基于 FastScanner)"""
     
-    def __init__(self, max_workers: int = None):
-        self.scanner = FastScanner(max_workers=max_workers)
-        self._file_type_manager = FileTypeManager()
+    def __init__(self, max_workers: int = None, use_processes: bool = False,
+                 cache: Optional[ScanCache] = None):
+        self.scanner = FastScanner(max_workers=max_workers, use_processes=use_processes,
+                                   cache=cache)
         
         self.COMPRESS_MODE_ENTIRE = COMPRESS_MODE_ENTIRE
         self.COMPRESS_MODE_SELECTIVE = COMPRESS_MODE_SELECTIVE
@@ -410,23 +600,31 @@ class FastFolderAnalyzer:
         if not root_scan:
             return {}
         
-        def build_node(scan: ScanResult) -> Dict[str, Any]:
+        # 每个目录的压缩包数量只取一次
+        archive_count = {path: sc.file_types.get('archive', 0) for path, sc in scans.items()}
+        
+        # 自底向上构建：按深度从深到浅处理，子节点总是先于父节点构建，无需递归
+        built: Dict[str, Dict[str, Any]] = {}
+        for scan in sorted(scans.values(), key=lambda sc: sc.depth, reverse=True):
+            # 链接已构建的子节点，同时检查直接子目录中是否有压缩包
+            children = []
+            has_child_archive = False
+            for subdir in scan.subdirs:
+                child = built.get(subdir)
+                if child is not None:
+                    children.append(child)
+                if archive_count.get(subdir, 0) > 0:
+                    has_child_archive = True
+            
             # 确定压缩模式
             compress_mode = self._determine_compress_mode_fast(
-                scan, target_types, scans
+                scan, target_types, has_child_archive
             )
             
-            # 构建子节点
-            children = []
-            for subdir in scan.subdirs:
-                child_scan = scans.get(subdir)
-                if child_scan:
-                    children.append(build_node(child_scan))
-            
             # 按文件数量排序子节点
-            children.sort(key=lambda x: x.get('total_files', 0), reverse=True)
+            children.sort(key=lambda x: x['total_files'], reverse=True)
             
-            return {
+            built[scan.path] = {
                 'path': scan.path,
                 'name': scan.name,
                 'depth': scan.depth,
@@ -437,24 +635,18 @@ class FastFolderAnalyzer:
                 'children': children if children else None
             }
         
-        return build_node(root_scan)
+        return built[root_scan.path]
     
     def _determine_compress_mode_fast(self, scan: ScanResult, 
                                       target_types: List[str],
-                                      all_scans: Dict[str, ScanResult]) -> str:
-        """快速确定压缩模式"""
-        if not scan.files:
+                                      has_child_archive: bool) -> str:
+        """快速确定压缩模式 (has_child_archive: 直接子目录中是否有压缩包，由调用方预先计算)"""
+        if not scan.total_files:
             return self.COMPRESS_MODE_SKIP
         
         # 检查是否有压缩包
         has_archive = scan.file_types.get('archive', 0) > 0
         
-        # 检查子目录是否有压缩包
-        has_child_archive = any(
-            all_scans.get(subdir, ScanResult(path='', name='', depth=0)).file_types.get('archive', 0) > 0
-            for subdir in scan.subdirs
-        )
-        
         if has_archive or has_child_archive:
             if not target_types:
                 return self.COMPRESS_MODE_SKIP
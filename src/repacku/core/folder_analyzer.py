@@ -7,15 +7,15 @@
 
 import os
 import sys
-import json
 import logging
 import argparse
 import datetime
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Any, Optional, Union
-from dataclasses import dataclass, field, asdict
-from collections import Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import heapq
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from functools import lru_cache
 
 # 导入Rich库
@@ -30,7 +30,7 @@ from rich.logging import RichHandler
 # 从通用工具模块导入共用功能
 from repacku.core.common_utils import (
     DEFAULT_FILE_TYPES, COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE, COMPRESS_MODE_SKIP,
-    FileTypeManager, get_file_type, is_file_in_types, is_blacklisted_path, get_folder_size,try_extended_media_match
+    FileTypeManager, ScanCache, write_json_atomic, is_file_in_types, is_blacklisted_path, get_folder_size,try_extended_media_match
 )
 
 # 尝试导入快速扫描器
@@ -47,6 +47,18 @@ from repacku.config.config import get_single_image_compress_rule
 # 设置Rich日志记录
 console = Console()
 
+
+def _build_ext_to_type() -> Dict[str, str]:
+    """扩展名 -> 文件类型 (与 FileTypeManager 一致：同一扩展名属于多个类型时取第一个)"""
+    mapping: Dict[str, str] = {}
+    for type_name, extensions in DEFAULT_FILE_TYPES.items():
+        for ext in extensions:
+            mapping.setdefault(ext, type_name)
+    return mapping
+
+
+_EXT_TO_TYPE = _build_ext_to_type()
+
 @dataclass
 class FolderInfo:
     """单个文件夹的信息，用于树状结构输出"""
@@ -65,71 +77,137 @@ class FolderInfo:
     dominant_types: List[str] = field(default_factory=list)  # 修正为list
     children: List["FolderInfo"] = field(default_factory=list)  # 子文件夹列表，用于树状结构
     
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典，便于JSON序列化"""
-        result = asdict(self)
+    def _output_file_types(self) -> Dict[str, int]:
+        """输出用的文件类型统计"""
         # 确保不重复输出相似信息
         # 如果file_types为空，用file_extensions生成file_types
-        if not result["file_types"] and result["file_extensions"]:
+        if not self.file_types and self.file_extensions:
             # 将扩展名映射到类型
             mapped_types = {}
-            for ext, count in result["file_extensions"].items():
-                file_type = None
-                for type_name, extensions in DEFAULT_FILE_TYPES.items():
-                    if ext in extensions:
-                        file_type = type_name
-                        break
-                
+            for ext, count in self.file_extensions.items():
+                file_type = _EXT_TO_TYPE.get(ext)
                 if file_type:
                     if file_type not in mapped_types:
                         mapped_types[file_type] = 0
                     mapped_types[file_type] += count
             
             if mapped_types:
-                result["file_types"] = mapped_types
-        return result
+                return mapped_types
+        return self.file_types
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，便于JSON序列化"""
+        # 逐字段手工构建 (asdict 会递归深拷贝整棵子树，代价很高)
+        return {
+            "path": self.path,
+            "name": self.name,
+            "parent_path": self.parent_path,
+            "depth": self.depth,
+            "weight": self.weight,
+            "total_files": self.total_files,
+            "total_size": self.total_size,
+            "size_mb": self.size_mb,
+            "compress_mode": self.compress_mode,
+            "recommendation": self.recommendation,
+            "file_types": self._output_file_types(),
+            "file_extensions": self.file_extensions,
+            "dominant_types": self.dominant_types,
+            "children": [child.to_dict() for child in self.children],
+        }
     
     def to_tree_dict(self) -> Dict[str, Any]:
-        """转换为树结构的字典表示"""
-        result = self.to_dict()
-        # 替换children字段为实际的子文件夹字典
+        """转换为树结构的字典表示
+        
+        直接构建，不经过 to_dict (否则每个节点的子树会先被完整转换一遍再丢弃)。
+        树结构中通过嵌套表示父子关系，不需要parent_path；没有子文件夹时省略children字段。
+        """
+        result = {
+            "path": self.path,
+            "name": self.name,
+            "depth": self.depth,
+            "weight": self.weight,
+            "total_files": self.total_files,
+            "total_size": self.total_size,
+            "size_mb": self.size_mb,
+            "compress_mode": self.compress_mode,
+            "recommendation": self.recommendation,
+            "file_types": self._output_file_types(),
+            "file_extensions": self.file_extensions,
+            "dominant_types": self.dominant_types,
+        }
         if self.children:
             result["children"] = [child.to_tree_dict() for child in self.children]
-        else:
-            # 如果没有子文件夹，可以省略children字段
-            result.pop("children", None)
-        
-        # 移除一些在树结构中不需要的字段
-        result.pop("parent_path", None)  # 树结构中通过嵌套表示父子关系，不需要parent_path
-        
         return result
 
+def _count_file_categories(files: List[Path], target_type_set: Optional[frozenset] = None
+                           ) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    """
+    统计文件类别与扩展名分布：扩展名、类别每个文件只计算一次，同一循环内完成三项统计
+    
+    Returns:
+        Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+            (文件类别计数, 全部非空扩展名计数, 属于目标类型的非空扩展名计数)
+    """
+    file_types_count = {}
+    all_ext_count = {}
+    matching_ext_count = {}
+    for file in files:
+        ext = file.suffix.lower()
+        file_type = _category_of(ext, file.name)
+        if file_type:
+            file_types_count[file_type] = file_types_count.get(file_type, 0) + 1
+        # 只记录非空扩展名，另外单独统计属于目标类型的扩展名
+        if ext:
+            all_ext_count[ext] = all_ext_count.get(ext, 0) + 1
+            if target_type_set is not None and file_type in target_type_set:
+                matching_ext_count[ext] = matching_ext_count.get(ext, 0) + 1
+    return file_types_count, all_ext_count, matching_ext_count
+
+def _category_of(ext: str, name: str) -> Optional[str]:
+    """由已小写的扩展名和文件名得到文件类别"""
+    file_type = _EXT_TO_TYPE.get(ext)
+    if file_type is not None:
+        return file_type
+    # 无法通过扩展名识别时，按文件名推断
+    filename = name.lower()
+    if "readme" in filename or "license" in filename or "changelog" in filename:
+        return "text"
+    return None
+
+
 def get_mime_category(file_path: Path) -> Optional[str]:
-    """根据文件的MIME类型判断其所属类别"""
-    # 直接使用通用工具模块中的get_file_type函数
-    return get_file_type(file_path)
+    """根据文件扩展名判断其所属类别 (与 get_file_type 结果一致，但只做一次字典查找)"""
+    return _category_of(file_path.suffix.lower(), file_path.name)
 
 
 class FolderAnalyzer:
     """文件夹分析器类，分析文件夹结构并生成配置"""
     
-    def __init__(self, custom_logging=None):
+    def __init__(self, custom_logging=None, use_processes: bool = False):
         """
         初始化文件夹分析器
         
         Args:
             custom_logging: 可选的自定义日志记录器，如果提供则使用该记录器
+            use_processes: 标准模式下把深层子树交给子进程分析 (快速扫描器则使用多进程扫描)，
+                绕开 GIL；适合 SSD 等 I/O 廉价、分类计算成为瓶颈的大目录树
         """
+        self.use_processes = use_processes
         self.COMPRESS_MODE_ENTIRE = COMPRESS_MODE_ENTIRE
         self.COMPRESS_MODE_SELECTIVE = COMPRESS_MODE_SELECTIVE
         self.COMPRESS_MODE_SKIP = COMPRESS_MODE_SKIP
+        # 单图压缩规则在一次分析过程中不变，只读取一次
+        self._single_image_rule = get_single_image_compress_rule()
+        # 文件类型管理器无逐次调用状态，整个分析过程共用一个实例
+        self._ftm = FileTypeManager()
     
-    def calculate_folder_weight(self, folder_path: Path) -> float:
+    def calculate_folder_weight(self, folder_path: Path, size_bytes: Optional[int] = None) -> float:
         """
         计算文件夹的权重
         
         Args:
             folder_path: 文件夹路径
+            size_bytes: 已知的文件夹 (含子文件夹) 总大小；为 None 时才遍历子树统计
             
         Returns:
             float: 文件夹权重值
@@ -139,7 +217,9 @@ class FolderAnalyzer:
             depth = len(str(folder_path).split(os.sep))
             
             # 获取文件夹大小，将大小作为次要因素
-            size_weight = get_folder_size(folder_path) / (1024 * 1024 * 1024)  # 转化为GB
+            if size_bytes is None:
+                size_bytes = get_folder_size(folder_path)
+            size_weight = size_bytes / (1024 * 1024 * 1024)  # 转化为GB
             
             # 综合权重 = 深度 + 大小权重*0.1，深度占主要部分
             weight = depth + size_weight * 0.1
@@ -154,18 +234,22 @@ class FolderAnalyzer:
         if not file_types:
             return []
         
-        # 按数量排序并取前N个
-        sorted_types = sorted(file_types.items(), key=lambda x: x[1], reverse=True)
-        return [t[0] for t in sorted_types[:top_n]]
+        # 按数量取前N个 (nlargest 与 sorted(..., reverse=True)[:N] 结果一致，但无需整体排序)
+        return [t[0] for t in heapq.nlargest(top_n, file_types.items(), key=itemgetter(1))]
     
     def _determine_compress_mode(self, folder_path: Path, 
                                files: List[Path], 
-                               file_types_count: Counter,
+                               file_types_count: Dict[str, int],
                                target_file_types: List[str] = None,
                                has_child_with_archive: bool = False,
-                               min_count: int = 2) -> Tuple[str, Dict[str, int]]:
+                               has_subfolders: bool = False,
+                               min_count: int = 2,
+                               target_type_set: Optional[frozenset] = None) -> str:
         """
-        根据文件类型分布确定压缩模式，同时返回符合条件的文件扩展名统计
+        根据文件类型分布确定压缩模式
+        
+        匹配目标类型的文件数直接由 file_types_count 求和得到，不再逐个文件判断；
+        要记录的扩展名统计由调用方用扫描时得到的计数按模式选取 (见 _extensions_for_mode)。
         
         Args:
             folder_path: 文件夹路径
@@ -173,42 +257,28 @@ class FolderAnalyzer:
             file_types_count: 文件类型计数
             target_file_types: 目标文件类型列表
             has_child_with_archive: 子文件夹中是否有压缩包
+            has_subfolders: 文件夹中是否有子文件夹 (由调用方扫描目录时顺带得到)
             min_count: 最小匹配文件数量，低于此数值则不进行压缩
+            target_type_set: 调用方预先构建的目标类型集合，整次分析只构建一次
         
         Returns:
-            Tuple[str, Dict[str, int]]: (压缩模式, 文件扩展名统计)
+            str: 压缩模式
         """
-        # 初始化符合条件的文件扩展名统计
-        file_ext_count = Counter()
+        if target_type_set is None and target_file_types:
+            target_type_set = frozenset(target_file_types)
         
         # 如果没有文件，跳过处理
         if not files:
-            return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+            return self.COMPRESS_MODE_SKIP
         
-        # 特殊规则：检查是否为单个图片且没有子文件夹的情况
-        if get_single_image_compress_rule():
-            # 检查是否有子文件夹 - 使用 os.scandir 替代 glob，避免特殊字符问题
-            try:
-                subfolders = [Path(entry.path) for entry in os.scandir(folder_path) if entry.is_dir()]
-            except OSError:
-                subfolders = []
-            has_subfolders = len(subfolders) > 0
-            
-            # 检查是否只有一个文件且为图片
-            if len(files) == 1 and not has_subfolders:
-                file_type_manager = FileTypeManager()
-                single_file = files[0]
-                
-                if file_type_manager.is_file_in_types(single_file, ["image"]):
-                    # 记录图片文件扩展名
-                    ext = single_file.suffix.lower()
-                    if ext:
-                        file_ext_count[ext] += 1
-                    return self.COMPRESS_MODE_ENTIRE, dict(file_ext_count)
+        # 特殊规则：单个图片且没有子文件夹时整体压缩
+        if self._single_image_rule:
+            if len(files) == 1 and not has_subfolders and file_types_count.get("image", 0) == 1:
+                return self.COMPRESS_MODE_ENTIRE
             
         # 如果文件夹在黑名单中，跳过处理
         if is_blacklisted_path(folder_path):
-            return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+            return self.COMPRESS_MODE_SKIP
             
         # 检查当前文件夹中是否有压缩包 - 只有当archive计数大于0时才认为有压缩包
         has_archive = file_types_count.get("archive", 0) > 0
@@ -217,85 +287,60 @@ class FolderAnalyzer:
         if has_archive or has_child_with_archive:
             # 如果没有指定目标类型，跳过处理（不压缩）
             if not target_file_types:
-                return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
-                
-            # 检查是否有匹配目标类型的文件
-            file_type_manager = FileTypeManager()
-            # 检查当前文件夹中的文件
-            matching_files = [f for f in files if file_type_manager.is_file_in_types(f, target_file_types)]
+                return self.COMPRESS_MODE_SKIP
             
-            # 如果有匹配的文件，统计它们的扩展名
-            if matching_files and len(matching_files) >= min_count:
-                for file in matching_files:
-                    ext = file.suffix.lower()
-                    if ext:  # 只记录非空扩展名
-                        file_ext_count[ext] += 1
-                
-                # 返回selective模式和扩展名统计
-                return self.COMPRESS_MODE_SELECTIVE, dict(file_ext_count)
-                
-            # 没有匹配的文件或匹配文件数量不满足最小要求，跳过处理
-            return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+            # 匹配目标类型的文件数量满足最小要求时选择性压缩，否则跳过
+            matching_count = sum(file_types_count.get(t, 0) for t in target_type_set)
+            if matching_count and matching_count >= min_count:
+                return self.COMPRESS_MODE_SELECTIVE
+            return self.COMPRESS_MODE_SKIP
         
-        # 如果没有指定目标类型，但文件数量满足最小要求，整体压缩，记录所有文件扩展名
+        # 如果没有指定目标类型，但文件数量满足最小要求，整体压缩
         if not target_file_types:
             if len(files) >= min_count:
-                for file in files:
-                    ext = file.suffix.lower()
-                    if ext:  # 只记录非空扩展名
-                        file_ext_count[ext] += 1
-                return self.COMPRESS_MODE_ENTIRE, dict(file_ext_count)
+                return self.COMPRESS_MODE_ENTIRE
             else:
-                return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+                return self.COMPRESS_MODE_SKIP
             
         # 开始处理基于目标类型的判断
-        file_type_manager = FileTypeManager()
         total_files = len(files)
-        
-        # 计算匹配目标类型的文件数量
-        matching_files = []
-        for file in files:
-            if file_type_manager.is_file_in_types(file, target_file_types):
-                matching_files.append(file)
-                # 统计匹配文件的扩展名
-                ext = file.suffix.lower()
-                if ext:  # 只记录非空扩展名
-                    file_ext_count[ext] += 1
-        
-        matching_count = len(matching_files)
+        matching_count = sum(file_types_count.get(t, 0) for t in target_type_set)
         
         # 如果匹配文件数量不满足最小要求，跳过处理
         if matching_count < min_count:
-            return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+            return self.COMPRESS_MODE_SKIP
             
         # 如果所有文件都匹配目标类型，整体压缩
         if matching_count == total_files and matching_count > 0:
-            return self.COMPRESS_MODE_ENTIRE, dict(file_ext_count)
+            return self.COMPRESS_MODE_ENTIRE
             
         # 特殊处理：如果目标类型包含'image'，且图片类型无法匹配全部文件，
         # 则尝试使用扩展媒体类型(图片+文档+文本)进行匹配
         if "image" in target_file_types and matching_count < total_files:
             # 使用自定义函数检查是否所有文件都符合扩展媒体类型
-            if try_extended_media_match(files, file_type_manager):
-                # 如果所有文件都是图片/文档/文本类型，重新计算所有文件的扩展名统计
-                file_ext_count = Counter()
-                for file in files:
-                    ext = file.suffix.lower()
-                    if ext:  # 只记录非空扩展名
-                        file_ext_count[ext] += 1
-                        
+            if try_extended_media_match(files, self._ftm):
                 logging.info(f"[#process]📊 文件夹包含图片和文档/文本文件，进行整体压缩: {folder_path.name}")
-                return self.COMPRESS_MODE_ENTIRE, dict(file_ext_count)
+                return self.COMPRESS_MODE_ENTIRE
         
         # 如果部分文件匹配目标类型，选择性压缩
         if matching_count > 0:
-            return self.COMPRESS_MODE_SELECTIVE, dict(file_ext_count)
+            return self.COMPRESS_MODE_SELECTIVE
             
         # 如果没有文件匹配，默认跳过
-        return self.COMPRESS_MODE_SKIP, dict(file_ext_count)
+        return self.COMPRESS_MODE_SKIP
+    
+    def _extensions_for_mode(self, compress_mode: str,
+                             all_ext_count: Dict[str, int],
+                             matching_ext_count: Dict[str, int]) -> Dict[str, int]:
+        """按压缩模式选取要记录的扩展名统计：整体压缩记录全部文件，选择性压缩只记录目标类型，跳过则不记录"""
+        if compress_mode == self.COMPRESS_MODE_ENTIRE:
+            return all_ext_count
+        if compress_mode == self.COMPRESS_MODE_SELECTIVE:
+            return matching_ext_count
+        return {}
     
     def _generate_recommendation(self, folder_path: Path, 
-                               file_types_count: Counter,
+                               file_types_count: Dict[str, int],
                                compress_mode: str) -> str:
         """生成处理建议"""
         if not file_types_count:
@@ -346,57 +391,48 @@ class FolderAnalyzer:
         
         # 只获取当前文件夹中的文件（不包括子文件夹中的文件）
         try:
-            # 使用 os.scandir 替代 glob，避免方括号等特殊字符被解释为通配符
-            all_items = [Path(entry.path) for entry in os.scandir(folder_path)]
-            regular_files = [f for f in all_items if f.is_file()]
+            # 单次 os.scandir：类型判断与大小都取自 DirEntry，不再对每个文件单独 stat
+            # (同时避免 glob 把方括号等特殊字符解释为通配符)
+            regular_files = []
+            total_size = 0
+            has_subfolders = False
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            regular_files.append(Path(entry.path))
+                            total_size += entry.stat().st_size
+                        elif entry.is_dir():
+                            has_subfolders = True
+                    except OSError:
+                        continue
             
             # 记录总文件数和总大小
             folder_info.total_files = len(regular_files)
-            folder_info.total_size = sum(f.stat().st_size for f in regular_files)
+            folder_info.total_size = total_size
             folder_info.size_mb = folder_info.total_size / (1024 * 1024)
             
             # 分析文件类型分布
-            file_types_count = Counter()
-            file_ext_count = Counter()
-            
-            # 获取文件类型管理器
-            file_type_manager = FileTypeManager()
+            target_set = frozenset(target_file_types) if target_file_types else None
+            file_types_count, all_ext_count, matching_ext_count = _count_file_categories(
+                regular_files, target_set
+            )
             
-            for file in regular_files:
-                # 获取文件扩展名
-                ext = file.suffix.lower()
-                
-                # 获取文件分类
-                file_type = get_mime_category(file)
-                if file_type:
-                    file_types_count[file_type] += 1
-                    
-                    # 只记录符合目标文件类型的扩展名
-                    # 如果指定了target_file_types，只记录这些类型的文件扩展名
-                    # 否则记录所有已知文件类型的扩展名
-                    should_record_ext = False
-                    if target_file_types:
-                        # 检查文件是否属于目标类型
-                        if file_type_manager.is_file_in_types(file, target_file_types):
-                            should_record_ext = True
-                    else:
-                        # 没有指定target_file_types，记录所有非空扩展名
-                        should_record_ext = True
-                    
-                    if should_record_ext and ext:
-                        file_ext_count[ext] += 1
-                    
             # 记录文件类型分布
-            folder_info.file_types = dict(file_types_count)
-            folder_info.file_extensions = dict(file_ext_count)  # 只记录符合目标类型的文件扩展名
+            folder_info.file_types = file_types_count
             folder_info.dominant_types = self._get_dominant_types(folder_info.file_types)
             
-            # 确定压缩模式 - 传入目标文件类型
-            folder_info.compress_mode, folder_info.file_extensions = self._determine_compress_mode(
+            # 确定压缩模式 - 传入目标文件类型，再按模式记录扩展名统计
+            folder_info.compress_mode = self._determine_compress_mode(
                 folder_path, 
                 regular_files, 
                 file_types_count,
-                target_file_types
+                target_file_types,
+                has_subfolders=has_subfolders,
+                target_type_set=target_set
+            )
+            folder_info.file_extensions = self._extensions_for_mode(
+                folder_info.compress_mode, all_ext_count, matching_ext_count
             )
             
             # 生成推荐处理方式
@@ -411,7 +447,7 @@ class FolderAnalyzer:
         
         return folder_info    
     def analyze_folder_structure(self, root_folder: Path, target_file_types: List[str] = None, 
-                                   use_fast_scanner: bool = True) -> FolderInfo:
+                                   use_fast_scanner: bool = True, use_cache: bool = False) -> FolderInfo:
         """
         分析文件夹结构，遍历所有子文件夹，构建树状结构
         
@@ -419,6 +455,7 @@ class FolderAnalyzer:
             root_folder: 根文件夹路径
             target_file_types: 目标文件类型列表，用于判断压缩模式
             use_fast_scanner: 是否使用快速扫描器 (默认启用)
+            use_cache: 是否使用磁盘扫描缓存 (按目录 mtime 失效，快速扫描与标准模式均适用)
             
         Returns:
             FolderInfo: 包含树状结构的根文件夹信息
@@ -429,26 +466,36 @@ class FolderAnalyzer:
         # 尝试使用快速扫描器
         if use_fast_scanner and HAS_FAST_SCANNER:
             try:
-                return self._analyze_with_fast_scanner(root_folder, target_file_types)
+                return self._analyze_with_fast_scanner(root_folder, target_file_types, use_cache)
             except Exception as e:
                 logging.warning(f"快速扫描器失败，回退到标准模式: {e}")
         
+        if use_cache:
+            with ScanCache() as cache:
+                return self._build_folder_tree(root_folder, "", 1, target_file_types, cache)
         return self._build_folder_tree(root_folder, "", 1, target_file_types)
     
     def _analyze_with_fast_scanner(self, root_folder: Path, 
-                                   target_file_types: List[str] = None) -> FolderInfo:
+                                   target_file_types: List[str] = None,
+                                   use_cache: bool = False) -> FolderInfo:
         """
         使用快速扫描器分析文件夹结构
         
         Args:
             root_folder: 根文件夹路径
             target_file_types: 目标文件类型列表
+            use_cache: 是否使用磁盘扫描缓存
             
         Returns:
             FolderInfo: 文件夹信息树
         """
-        scanner = FastScanner()
-        scan_results = scanner.scan_tree_parallel(root_folder, target_file_types)
+        if use_cache:
+            with ScanCache() as cache:
+                scanner = FastScanner(use_processes=self.use_processes, cache=cache)
+                scan_results = scanner.scan_tree_parallel(root_folder, target_file_types)
+        else:
+            scanner = FastScanner(use_processes=self.use_processes)
+            scan_results = scanner.scan_tree_parallel(root_folder, target_file_types)
         
         # 将扫描结果转换为 FolderInfo 树
         return self._convert_scan_to_folder_info(
@@ -480,13 +527,15 @@ class FolderAnalyzer:
         
         # 确定压缩模式
         has_archive = scan.file_types.get('archive', 0) > 0
-        has_child_archive = any(
-            scans.get(subdir, type('', (), {'file_types': {}})()).file_types.get('archive', 0) > 0
-            for subdir in scan.subdirs
-        )
+        has_child_archive = False
+        for subdir in scan.subdirs:
+            child_scan = scans.get(subdir)
+            if child_scan is not None and child_scan.file_types.get('archive', 0) > 0:
+                has_child_archive = True
+                break
         
         # 简化的压缩模式判断
-        if not scan.files:
+        if not scan.total_files:
             folder_info.compress_mode = self.COMPRESS_MODE_SKIP
         elif has_archive or has_child_archive:
             if target_types:
@@ -519,23 +568,136 @@ class FolderAnalyzer:
         return folder_info
 
     def _build_folder_tree(self, folder_path: Path, parent_path: str = "", depth: int = 1, 
-                         target_file_types: List[str] = None) -> FolderInfo:
+                         target_file_types: List[str] = None,
+                         cache: Optional[ScanCache] = None) -> FolderInfo:
         """
-        递归构建文件夹树结构
+        构建文件夹树结构
+        
+        所有目录共用一个有界线程池：每个目录作为独立任务扫描，完成后把其子目录作为新任务提交
+        (工作队列)，任务之间不互相等待。全部扫描完成后按深度自底向上组装树并确定压缩模式，
+        因为父文件夹的压缩模式依赖子文件夹的结果。
         
         Args:
-            folder_path: 当前处理的文件夹路径
+            folder_path: 根文件夹路径
             parent_path: 父文件夹路径
-            depth: 当前深度
+            depth: 根文件夹深度
             target_file_types: 目标文件类型
+            cache: 单目录扫描结果缓存 (按目录 mtime 失效)，None 表示不使用缓存
             
         Returns:
-            FolderInfo: 当前文件夹的树状结构
+            FolderInfo: 根文件夹的树状结构
         """
         # 检查是否为黑名单路径
         if is_blacklisted_path(folder_path):
             return None
         
+        if self.use_processes:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as process_pool:
+                result = self._build_subtree(folder_path, parent_path, depth, target_file_types,
+                                             process_pool, cache)
+        else:
+            result = self._build_subtree(folder_path, parent_path, depth, target_file_types, cache=cache)
+        return result[0] if result else None
+    
+    def _build_subtree(self, folder_path: Path, parent_path: str, depth: int,
+                       target_file_types: List[str] = None,
+                       process_pool: Optional[ProcessPoolExecutor] = None,
+                       cache: Optional[ScanCache] = None) -> Optional[Tuple[FolderInfo, int]]:
+        """
+        用线程池扫描并组装一棵子树，返回 (根文件夹信息, 子树总大小)
+        
+        同一父文件夹下的子文件夹按批提交 (见 _scan_batch_size)，一个线程任务连续扫描一批兄弟目录，
+        分摊任务提交与调度的开销。
+        提供 process_pool 时，线程池只扫描上面 _PROCESS_SUBTREE_LEVEL - 1 层，
+        更深的子树各自整体交给子进程分析 (见 _analyze_subtree)，完成后作为现成的子节点并入；
+        扫描缓存 (shelve) 不能跨进程共享，只用于本进程内扫描的目录。
+        """
+        # 路径 -> (文件夹信息, 子文件夹列表, 文件列表, 自身文件大小, 是否有子文件夹)
+        scanned: Dict[str, Tuple[FolderInfo, List[Path], List[Path], int, bool]] = {}
+        # 子进程分析完成的子树：路径 -> (子树根信息, 子树总大小)
+        subtrees: Dict[str, Tuple[FolderInfo, int]] = {}
+        # 子进程任务 -> (路径, 父路径, 深度)，失败时据此改回线程扫描
+        subtree_tasks = {}
+        process_depth = depth + _PROCESS_SUBTREE_LEVEL - 1
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(self._scan_tree_batch, [folder_path], parent_path, depth, cache)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in subtree_tasks:
+                        item, item_parent, item_depth = subtree_tasks.pop(future)
+                        try:
+                            subtree = future.result()
+                        except Exception as e:
+                            logging.warning(f"子进程分析失败，改用线程扫描: {item}, {e}")
+                            pending.add(executor.submit(
+                                self._scan_tree_batch, [item], item_parent, item_depth, cache
+                            ))
+                            continue
+                        if subtree is not None:
+                            subtrees[subtree[0].path] = subtree
+                        continue
+                    
+                    for node in future.result():
+                        folder_info, subfolders = node[0], node[1]
+                        scanned[folder_info.path] = node
+                        if not subfolders:
+                            continue
+                        child_depth = folder_info.depth + 1
+                        if process_pool is not None and child_depth >= process_depth:
+                            for item in subfolders:
+                                task = process_pool.submit(
+                                    _analyze_subtree, str(item), folder_info.path, child_depth, target_file_types
+                                )
+                                subtree_tasks[task] = (item, folder_info.path, child_depth)
+                                pending.add(task)
+                        else:
+                            batch_size = _scan_batch_size(len(subfolders), max_workers)
+                            for i in range(0, len(subfolders), batch_size):
+                                pending.add(executor.submit(
+                                    self._scan_tree_batch, subfolders[i:i + batch_size],
+                                    folder_info.path, child_depth, cache
+                                ))
+        
+        # 目标类型集合整棵树只构建一次
+        target_type_set = frozenset(target_file_types) if target_file_types else None
+        
+        # 路径 -> 文件夹信息 (线程扫描的节点与子进程返回的子树根)
+        folders: Dict[str, FolderInfo] = {path: node[0] for path, node in scanned.items()}
+        subtree_sizes: Dict[str, int] = {}
+        for path, (subtree_root, subtree_size) in subtrees.items():
+            folders[path] = subtree_root
+            subtree_sizes[path] = subtree_size
+        
+        # 自底向上组装：子文件夹总是先于父文件夹完成，子树大小也随之逐层累加
+        for folder_info, subfolders, regular_files, self_size, has_subfolders in sorted(
+                scanned.values(), key=lambda node: node[0].depth, reverse=True):
+            subtree_size = self_size + sum(subtree_sizes.get(str(item), 0) for item in subfolders)
+            subtree_sizes[folder_info.path] = subtree_size
+            folder_info.weight = self.calculate_folder_weight(Path(folder_info.path), subtree_size)
+            self._finish_tree_node(folder_info, subfolders, regular_files, folders,
+                                   target_file_types, has_subfolders, target_type_set)
+        
+        root = scanned.get(str(folder_path))
+        if root is None:
+            return None
+        return root[0], subtree_sizes[root[0].path]
+    
+    def _scan_tree_batch(self, folders: List[Path], parent_path: str, depth: int,
+                         cache: Optional[ScanCache] = None) -> List[Tuple[FolderInfo, List[Path], List[Path], int, bool]]:
+        """扫描一批同级目录 (线程池任务)，依次返回各目录的扫描结果"""
+        return [self._scan_tree_node(item, parent_path, depth, cache) for item in folders]
+    
+    def _scan_tree_node(self, folder_path: Path, parent_path: str, depth: int,
+                        cache: Optional[ScanCache] = None) -> Tuple[FolderInfo, List[Path], List[Path], int, bool]:
+        """扫描单个目录 (线程池任务)：创建文件夹信息，列出子文件夹与文件并累计自身文件大小
+        
+        黑名单子文件夹在这里就被剔除，不会作为任务提交，根目录的黑名单检查由调用方完成；
+        是否有子文件夹 (单图规则使用) 仍把黑名单子文件夹计算在内。
+        提供 cache 时，目录 mtime 未变就直接复用上次的条目列表，不再 scandir 与逐个 stat；
+        文件原地修改不会改变目录 mtime，此时复用的自身大小可能过期，只影响权重中很小的大小分量。
+        """
         # 创建当前文件夹的信息对象
         folder_info = FolderInfo(
             path=str(folder_path),
@@ -544,65 +706,97 @@ class FolderAnalyzer:
             depth=depth
         )
         
-        # 计算文件夹权重
-        folder_info.weight = self.calculate_folder_weight(folder_path)
+        key = mtime_ns = None
+        listing = None
+        if cache is not None:
+            try:
+                mtime_ns = os.stat(folder_path).st_mtime_ns
+                key = f"tree|{folder_path}"
+                listing = cache.get(key, mtime_ns)
+            except OSError:
+                pass
+        
+        if listing is None:
+            # 单次 os.scandir 同时划分子文件夹与文件 (也避免 glob 把方括号等特殊字符解释为通配符)
+            # 自身文件大小顺带从 DirEntry 取得，权重所需的子树大小在组装阶段自底向上累加，
+            # 不再对每个目录单独遍历整棵子树
+            dir_names = []
+            file_names = []
+            self_size = 0
+            try:
+                with os.scandir(folder_path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                dir_names.append(entry.name)
+                            elif entry.is_file():
+                                file_names.append(entry.name)
+                                if not entry.is_symlink():
+                                    self_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError as e:
+                logging.error(f"扫描子文件夹时出错: {folder_path}, {str(e)}")
+                key = None
+            listing = (dir_names, file_names, self_size)
+            if key is not None:
+                cache.put(key, mtime_ns, listing)
+        
+        dir_names, file_names, self_size = listing
+        # 提交任务前剪掉黑名单子树
+        subfolders = [folder_path / name for name in dir_names
+                      if not is_blacklisted_path(os.path.join(folder_info.path, name))]
+        regular_files = [folder_path / name for name in file_names]
+        return folder_info, subfolders, regular_files, self_size, bool(dir_names)
+    
+    def _finish_tree_node(self, folder_info: FolderInfo,
+                          subfolders: List[Path],
+                          regular_files: List[Path],
+                          folders: Dict[str, FolderInfo],
+                          target_file_types: List[str] = None,
+                          has_subfolders: bool = False,
+                          target_type_set: Optional[frozenset] = None) -> None:
+        """链接子文件夹并分析当前文件夹文件、确定压缩模式 (子文件夹需已完成)"""
+        folder_path = Path(folder_info.path)
         
-        # 递归处理所有子文件夹（多线程并发）
         children = []
         has_child_with_archive = False
-        # 使用 os.scandir 替代 glob，避免方括号等特殊字符被解释为通配符
-        try:
-            subfolders = [Path(entry.path) for entry in os.scandir(folder_path) if entry.is_dir()]
-        except OSError as e:
-            logging.error(f"扫描子文件夹时出错: {folder_path}, {str(e)}")
-            subfolders = []
-        def process_child(item):
-            return self._build_folder_tree(
-                item, 
-                parent_path=str(folder_path),
-                depth=depth + 1,
-                target_file_types=target_file_types
-            )
-        with ThreadPoolExecutor() as executor:
-            future_to_item = {executor.submit(process_child, item): item for item in subfolders}
-            for future in as_completed(future_to_item):
-                child_info = future.result()
-                if child_info:
-                    children.append(child_info)
-                    # 检查子文件夹中是否有archive类型
-                    if child_info.file_types.get("archive", 0) > 0 or child_info.compress_mode == self.COMPRESS_MODE_SKIP:
-                        has_child_with_archive = True
+        for item in subfolders:
+            child_info = folders.get(str(item))
+            if child_info is None:
+                continue
+            children.append(child_info)
+            # 检查子文件夹中是否有archive类型
+            if child_info.file_types.get("archive", 0) > 0 or child_info.compress_mode == self.COMPRESS_MODE_SKIP:
+                has_child_with_archive = True
         # 按权重降序和名称升序排序子文件夹
         children.sort(key=lambda x: (-x.weight, x.name))
         folder_info.children = children
         
-        # 分析当前文件夹文件（不包括子文件夹）- 使用 os.scandir 替代 glob
         try:
-            all_items = [Path(entry.path) for entry in os.scandir(folder_path)]
-            regular_files = [f for f in all_items if f.is_file()]
             # 记录总文件数
             folder_info.total_files = len(regular_files)
             # 注释掉统计文件大小相关代码
             # folder_info.total_size = sum(f.stat().st_size for f in regular_files)
             # folder_info.size_mb = folder_info.total_size / (1024 * 1024)
             # 分析文件类型分布
-            file_types_count = Counter()
-            file_ext_count = Counter()
-            for file in regular_files:
-                ext = file.suffix.lower()
-                file_ext_count[ext] += 1
-                file_type = get_mime_category(file)
-                if file_type:
-                    file_types_count[file_type] += 1
-            folder_info.file_types = dict(file_types_count)
-            folder_info.file_extensions = dict(file_ext_count)
+            file_types_count, all_ext_count, matching_ext_count = _count_file_categories(
+                regular_files, target_type_set
+            )
+            folder_info.file_types = file_types_count
             folder_info.dominant_types = self._get_dominant_types(folder_info.file_types)
-            folder_info.compress_mode, folder_info.file_extensions = self._determine_compress_mode(
+            folder_info.compress_mode = self._determine_compress_mode(
                 folder_path, 
                 regular_files, 
                 file_types_count,
                 target_file_types,
-                has_child_with_archive
+                has_child_with_archive,
+                has_subfolders=has_subfolders,
+                target_type_set=target_type_set
+            )
+            # 扩展名统计按子文件夹提升前的模式选取
+            folder_info.file_extensions = self._extensions_for_mode(
+                folder_info.compress_mode, all_ext_count, matching_ext_count
             )
             for child in folder_info.children:
                 if child.compress_mode not in [None, "", self.COMPRESS_MODE_SKIP]:
@@ -615,23 +809,20 @@ class FolderAnalyzer:
             )
         except Exception as e:
             logging.error(f"分析文件夹时出错: {folder_path}, {str(e)}")
-        return folder_info
     
-    def generate_config_json(self, root_folder: Path,
-                          output_path: Optional[Path] = None,
+    def build_config_dict(self, root_folder: Path,
                           target_file_types: List[str] = None,
-                          root_info: Optional[FolderInfo] = None) -> str: # 添加 root_info 参数
+                          root_info: Optional[FolderInfo] = None) -> Dict[str, Any]:
         """
-        生成树状结构的文件夹配置JSON
+        构建树状结构的文件夹配置字典 (即 generate_config_json 写入的内容)
         
         Args:
             root_folder: 根文件夹路径
-            output_path: 输出JSON文件的路径，默认为与文件夹同名的json文件
             target_file_types: 目标文件类型列表，用于记录在配置中
             root_info: 可选的预先分析好的根文件夹信息
         
         Returns:
-            str: 生成的JSON配置文件路径
+            Dict[str, Any]: 包含 folder_tree 与 config 的配置字典
         """
         # 如果没有提供 root_info，则分析文件夹树结构
         if root_info is None:
@@ -651,13 +842,31 @@ class FolderAnalyzer:
              raise ValueError("无法获取文件夹信息，分析失败。")
 
         # 准备配置数据 (树形结构)
-        config = {
+        return {
             "folder_tree": root_info.to_tree_dict(),
             "config": {
                 "timestamp": datetime.datetime.now().isoformat(),
                 "target_file_types": target_file_types or []
             }
         }
+    
+    def generate_config_json(self, root_folder: Path,
+                          output_path: Optional[Path] = None,
+                          target_file_types: List[str] = None,
+                          root_info: Optional[FolderInfo] = None) -> str: # 添加 root_info 参数
+        """
+        生成树状结构的文件夹配置JSON
+        
+        Args:
+            root_folder: 根文件夹路径
+            output_path: 输出JSON文件的路径，默认为与文件夹同名的json文件
+            target_file_types: 目标文件类型列表，用于记录在配置中
+            root_info: 可选的预先分析好的根文件夹信息
+        
+        Returns:
+            str: 生成的JSON配置文件路径
+        """
+        config = self.build_config_dict(root_folder, target_file_types=target_file_types, root_info=root_info)
         
         # 确定输出路径
         if output_path is None:
@@ -665,9 +874,8 @@ class FolderAnalyzer:
         else:
             output_path = Path(output_path)
         
-        # 写入JSON文件 - 使用UTF-8编码并确保不使用ASCII转义中文字符
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        # 写入JSON文件 - UTF-8 编码、中文不转义，原子替换
+        write_json_atomic(output_path, config)
         
         console.print(f"[bold green]✓[/] 已生成配置文件: {output_path}")
         logging.info(f"已生成配置文件: {output_path}")
@@ -723,6 +931,24 @@ class FolderAnalyzer:
         return result
 
 
+# 多进程模式下，从根文件夹 (第 1 层) 算起第几层的子树整体交给子进程分析
+_PROCESS_SUBTREE_LEVEL = 3
+
+# 一个线程任务最多连续扫描的同级目录数
+_SCAN_BATCH_MAX = 64
+
+
+def _scan_batch_size(sibling_count: int, max_workers: int) -> int:
+    """同级目录的分批大小：目录多时成批提交，目录少时仍一个目录一个任务以保持并行度"""
+    return max(1, min(_SCAN_BATCH_MAX, sibling_count // max_workers))
+
+
+def _analyze_subtree(folder_path: str, parent_path: str, depth: int,
+                     target_file_types: List[str] = None) -> Optional[Tuple[FolderInfo, int]]:
+    """进程池任务：用独立的分析器 (线程模式) 分析一整棵子树，返回 (子树根信息, 子树总大小)"""
+    return FolderAnalyzer()._build_subtree(Path(folder_path), parent_path, depth, target_file_types)
+
+
 def display_folder_structure(root_folder: FolderInfo):
     """将树状结构的文件夹结构打印到控制台，使用Rich美化"""
     console.print(Panel.fit("[bold cyan]文件夹结构分析[/bold cyan]", border_style="cyan"))
@@ -746,7 +972,7 @@ def display_folder_structure(root_folder: FolderInfo):
     
     # 显示根文件夹的文件类型
     if root_folder.file_types:
-        for file_type, count in sorted(root_folder.file_types.items(), key=lambda x: x[1], reverse=True)[:3]:
+        for file_type, count in heapq.nlargest(3, root_folder.file_types.items(), key=itemgetter(1)):
             type_color = "green" if file_type in ["image", "video"] else "blue"
             tree.add(f"[{type_color}]{file_type}[/{type_color}]: {count}个文件")
     
@@ -814,37 +1040,45 @@ def display_folder_structure(root_folder: FolderInfo):
     
     console.print(compression_table)
 
+# 树状显示用的压缩模式颜色与中文名称
+_MODE_COLORS = {
+    "entire": "green",
+    "selective": "yellow",
+    "skip": "red"
+}
+_MODE_NAMES = {
+    "entire": "🦷整体压缩",
+    "selective": "🪴选择性压缩",
+    "skip": "🥷跳过"
+}
+
 def _add_folder_to_tree(parent_tree: Tree, folder: FolderInfo):
-    """递归地将文件夹添加到Rich树中"""
-    for child in folder.children:
-        # 根据压缩模式选择颜色
-        mode_color = {
-            "entire": "green",
-            "selective": "yellow",
-            "skip": "red"
-        }.get(child.compress_mode, "white")
-        
-        # 获取压缩模式的中文名称
-        mode_name = {
-            "entire": "🦷整体压缩",
-            "selective": "🪴选择性压缩",
-            "skip": "🥷跳过"
-        }.get(child.compress_mode, "未设置")
-        
-        # 创建子树
-        child_tree = parent_tree.add(
-            f"[bold {mode_color}]{child.name}[/bold {mode_color}] [dim]({child.total_files}个文件, "
-            f"{child.size_mb:.2f} MB, 模式: {mode_name})[/dim]"
-        )
-        
-        # 添加文件类型信息
-        if child.file_types:
-            for file_type, count in sorted(child.file_types.items(), key=lambda x: x[1], reverse=True)[:3]:
-                type_color = "green" if file_type in ["image", "video"] else "blue"
-                child_tree.add(f"[{type_color}]{file_type}[/{type_color}]: {count}个文件")
-        
-        # 递归处理子文件夹
-        _add_folder_to_tree(child_tree, child)
+    """将文件夹的所有子孙文件夹添加到Rich树中 (显式栈，不受递归深度限制)
+    
+    每个节点下先添加文件类型信息，再添加其子文件夹，顺序与原先的递归实现一致。
+    """
+    stack = [(parent_tree, folder)]
+    while stack:
+        tree_node, current = stack.pop()
+        for child in current.children:
+            # 根据压缩模式选择颜色与中文名称
+            mode_color = _MODE_COLORS.get(child.compress_mode, "white")
+            mode_name = _MODE_NAMES.get(child.compress_mode, "未设置")
+            
+            # 创建子树
+            child_tree = tree_node.add(
+                f"[bold {mode_color}]{child.name}[/bold {mode_color}] [dim]({child.total_files}个文件, "
+                f"{child.size_mb:.2f} MB, 模式: {mode_name})[/dim]"
+            )
+            
+            # 添加文件类型信息
+            if child.file_types:
+                for file_type, count in heapq.nlargest(3, child.file_types.items(), key=itemgetter(1)):
+                    type_color = "green" if file_type in ["image", "video"] else "blue"
+                    child_tree.add(f"[{type_color}]{file_type}[/{type_color}]: {count}个文件")
+            
+            # 子文件夹稍后处理，添加到 child_tree 中
+            stack.append((child_tree, child))
 
 def _collect_compression_stats(folder: FolderInfo) -> Dict[str, Dict[str, Any]]:
     """收集文件夹的压缩模式统计数据"""
@@ -856,38 +1090,36 @@ def _collect_compression_stats(folder: FolderInfo) -> Dict[str, Dict[str, Any]]:
         "none": {"count": 0, "files": 0, "size": 0.0}
     }
     
-    # 添加当前文件夹数据
-    mode = folder.compress_mode or "none"
-    stats[mode]["count"] += 1
-    stats[mode]["files"] += folder.total_files
-    stats[mode]["size"] += folder.size_mb
-    
-    # 递归处理子文件夹
-    for child in folder.children:
-        child_stats = _collect_compression_stats(child)
-        for mode, data in child_stats.items():
-            stats[mode]["count"] += data["count"]
-            stats[mode]["files"] += data["files"]
-            stats[mode]["size"] += data["size"]
+    # 显式栈遍历整棵树，全部累加到同一个统计字典 (不受递归深度限制)
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        mode_stats = stats[current.compress_mode or "none"]
+        mode_stats["count"] += 1
+        mode_stats["files"] += current.total_files
+        mode_stats["size"] += current.size_mb
+        stack.extend(current.children)
     
     return stats
 
 def _get_compression_folders(folder: FolderInfo) -> List[FolderInfo]:
-    """获取所有需要压缩的文件夹"""
+    """获取所有需要压缩的文件夹 (先序：父文件夹在前，子文件夹按原顺序)"""
     result = []
     
-    # 如果当前文件夹需要压缩，添加到结果
-    if folder.compress_mode in ["entire", "selective"]:
-        result.append(folder)
-    
-    # 递归处理子文件夹
-    for child in folder.children:
-        result.extend(_get_compression_folders(child))
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        # 如果当前文件夹需要压缩，添加到结果
+        if current.compress_mode in ["entire", "selective"]:
+            result.append(current)
+        # 逆序入栈，保证子文件夹按原顺序出栈
+        stack.extend(reversed(current.children))
     
     return result
 
 def analyze_folder(folder_path: Union[str, Path], target_file_types: List[str] = None, 
-                  output_path: Optional[Union[str, Path]] = None, display: bool = False) -> str:
+                  output_path: Optional[Union[str, Path]] = None, display: bool = False,
+                  use_cache: bool = False) -> str:
     """
     API函数：分析单个文件夹并生成配置
     
@@ -896,6 +1128,7 @@ def analyze_folder(folder_path: Union[str, Path], target_file_types: List[str] =
         target_file_types: 目标文件类型列表
         output_path: 输出配置文件路径
         display: 是否在控制台显示结果
+        use_cache: 是否使用磁盘扫描缓存 (适合先 analyze 再 compress 的重复扫描)
         
     Returns:
         str: 生成的配置文件路径
@@ -916,7 +1149,8 @@ def analyze_folder(folder_path: Union[str, Path], target_file_types: List[str] =
     analyzer = FolderAnalyzer()
     
     # 分析文件夹结构 (只执行一次)
-    root_info = analyzer.analyze_folder_structure(folder_path, target_file_types=target_file_types)
+    root_info = analyzer.analyze_folder_structure(folder_path, target_file_types=target_file_types,
+                                                  use_cache=use_cache)
 
     # 如果 root_info 为 None (例如，路径是黑名单)，则提前退出或抛出错误
     if root_info is None:
@@ -10,16 +10,162 @@
 
 import os
 import logging
+import queue
+import re
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterator, Optional
 from loguru import logger
 from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn, TimeElapsedColumn
 
 # 复用核心压缩器
 from repacku.core.zip_compressor import ZipCompressor, CompressionResult
 
 console = Console()
 
+# 视为"已有压缩结果"的压缩包后缀
+_ARCHIVE_EXTS = frozenset({'.zip', '.7z', '.rar', '.tar', '.gz', '.bz2', '.xz'})
+
+# 按名称末尾几个字符判断压缩包：后缀长度只有 3/4 两种，切片后小写即可查表，
+# 无需 os.path.splitext 拆分整个文件名，也不必对整个文件名做 lower()
+_ARCHIVE_TAILS4 = frozenset(e for e in _ARCHIVE_EXTS if len(e) == 4)
+_ARCHIVE_TAILS3 = frozenset(e for e in _ARCHIVE_EXTS if len(e) == 3)
+
+
+def _is_archive_name(name: str) -> bool:
+    """文件名是否以 _ARCHIVE_EXTS 中的后缀结尾 (不区分大小写)"""
+    return name[-4:].lower() in _ARCHIVE_TAILS4 or name[-3:].lower() in _ARCHIVE_TAILS3
+
+
+# 画集文件夹名称标记：只对目录名做子串判断，命中后才使用完整路径
+_GALLERY_MARK = ". 画集"
+
+# 扫描画集时不进入的目录：版本库/缓存/系统保留目录，其下不可能是画集却可能有海量子目录
+_SKIP_DIRS = frozenset({'__pycache__', '.git', 'node_modules', 'System Volume Information', '$RECYCLE.BIN'})
+
+
+def _is_skipped_dir(name: str) -> bool:
+    """保留目录或隐藏目录 (以 "." 开头；". 画集" 这类点后带空格的名称不算隐藏)"""
+    return name in _SKIP_DIRS or (name.startswith('.') and not name.startswith('. '))
+
+
+def _report(level: str, message: str, style: str = "") -> None:
+    """输出一条状态信息：写入 loguru，并以纯文本 + 整行样式打印到 Rich 控制台
+    
+    同一条消息只格式化一次；控制台输出关闭 markup/高亮解析，既省去逐条解析的开销，
+    也避免路径中的方括号被当成 Rich 标签吞掉。
+    """
+    logger.opt(depth=1).log(level.upper(), message)
+    console.print(message, style=style or None, markup=False, highlight=False)
+
+
+def _contains_archive(path: str) -> bool:
+    """按层 (广度优先) 用 os.scandir 查找压缩包文件，命中第一个即返回；无法读取的目录直接跳过
+    
+    每一层的文件都先于更深层检查，压缩包与内容同级 (最常见的布局) 时无需进入任何子目录。
+    类型判断用 DirEntry 自带的 d_type，不为每个条目额外 stat，也不构造 Path 对象。
+    """
+    pending = deque([path])
+    while pending:
+        current = pending.popleft()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            if _is_archive_name(entry.name):
+                                return True
+                        elif entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return False
+
+
+def _scan_archive_presence(parent: str) -> Dict[str, bool]:
+    """一次遍历 parent，标记每个一级子文件夹内部(递归)是否含有压缩包
+    
+    所有一级子文件夹共用同一个广度优先队列，发现的压缩包归属到其所在的一级子文件夹；
+    某个子文件夹一旦命中，队列中属于它的剩余目录直接丢弃，不再继续扫描。
+    返回 {一级子文件夹路径: 是否含压缩包}，键与 DirEntry.path 一致。
+    """
+    presence: Dict[str, bool] = {}
+    pending = deque()
+    try:
+        with os.scandir(parent) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        presence[entry.path] = False
+                        pending.append((entry.path, entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        return presence
+    while pending:
+        current, top = pending.popleft()
+        if presence[top]:
+            continue
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            if _is_archive_name(entry.name):
+                                presence[top] = True
+                                break
+                        elif entry.is_dir(follow_symlinks=False):
+                            pending.append((entry.path, top))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return presence
+
+
+def _remove_tree(path: str) -> None:
+    """删除已打包的源文件夹 (可在后台线程中执行)，失败只报告不抛出"""
+    try:
+        shutil.rmtree(path)
+        logger.debug(f"🗑️ 已删除源文件夹: {path}")
+    except OSError as e:
+        _report("warning", f"⚠️ 删除源文件夹失败: {path} -> {e}", "yellow")
+
+
+def _walk_dirs(root: str,
+               prune: Optional[Callable[[os.DirEntry], bool]] = None) -> Iterator[os.DirEntry]:
+    """递归列出 root 下的所有子目录 (只产出目录，不收集文件列表)
+    
+    顺序与 os.walk 自顶向下一致：先产出当前目录的全部子目录，再依次深入；
+    与 os.walk 默认行为相同，符号链接目录会被列出但不进入。
+    隐藏目录与 _SKIP_DIRS 中的保留目录连同其整个子树一并跳过。
+    prune(entry) 为 True 的目录照常产出，但不再进入其子树。
+    """
+    dirs = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if _is_skipped_dir(entry.name):
+                    continue
+                try:
+                    if entry.is_dir():
+                        dirs.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        return
+    yield from dirs
+    for entry in dirs:
+        if not entry.is_symlink() and not (prune and prune(entry)):
+            yield from _walk_dirs(entry.path, prune)
+
+
 class SinglePacker:
     """单层目录打包工具
     
@@ -30,15 +176,22 @@ class SinglePacker:
     """
     
     SUPPORTED_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif', '.gif')
+    # 由扩展名列表预编译的锚定正则，一次 search 判断是否图片，不必拆分扩展名再 lower()
+    _IMG_RE = re.compile(
+        "(?:" + "|".join(re.escape(ext) for ext in SUPPORTED_IMAGE_EXTENSIONS) + ")$",
+        re.IGNORECASE,
+    )
     
-    def __init__(self, compression_level: Optional[int] = None, threads: int = 16):
+    def __init__(self, compression_level: Optional[int] = None, threads: Optional[int] = None):
         """初始化单层打包工具并复用 ZipCompressor
         
         Args:
             compression_level: 压缩级别(0-9)，不传则读取配置
-            threads: 压缩线程数
+            threads: 单个压缩任务的线程数，不传则按 CPU 自动计算 (与 ZipCompressor 一致)
         """
         self.compressor = ZipCompressor(compression_level=compression_level, threads=threads)
+        # 子文件夹并行打包的任务数，保证 任务数 * 单任务线程数 不超过逻辑核心数
+        self.parallel_workers = max(1, (os.cpu_count() or 1) // self.compressor.threads)
 
     # ---------------- Internal helpers -----------------
     def _has_internal_archive(self, folder_path: str | Path) -> bool:
@@ -47,14 +200,47 @@ class SinglePacker:
         用于跳过已经含有压缩结果的目录，避免重复打包。
         支持常见后缀: .zip .7z .rar .tar .gz .bz2 .xz
         """
-        p = Path(folder_path)
-        if not p.exists() or not p.is_dir():
+        if not os.path.isdir(folder_path):
             return False
-        archive_exts = {'.zip', '.7z', '.rar', '.tar', '.gz', '.bz2', '.xz'}
-        for child in p.rglob('*'):
-            if child.is_file() and child.suffix.lower() in archive_exts:
-                return True
-        return False
+        return _contains_archive(os.fspath(folder_path))
+    
+    def _pack_subdir(self, subdir: str, directory_path: str, delete_after: bool,
+                     has_archive: Optional[bool] = None,
+                     delete_pool: Optional[ThreadPoolExecutor] = None) -> None:
+        """把一个一级子文件夹打包为同级的 <子文件夹名>.zip (线程池任务)
+        
+        has_archive 为 _scan_archive_presence 预先得到的检查结果，不传则在此同步检查。
+        delete_after 时源文件夹在压缩成功后删除：传入 delete_pool 则交给后台线程删除，
+        当前线程可以立即开始下一个子文件夹的压缩；不传则在此同步删除。
+        """
+        # subdir 来自 DirEntry.path (父目录 + os.sep + 名称)，直接取最后一段，不再走 basename 的通用解析
+        subdir_name = subdir.rpartition(os.sep)[2]
+
+        # 检查内部是否已有压缩包
+        if has_archive is None:
+            has_archive = self._has_internal_archive(subdir)
+        if has_archive:
+            _report("info", f"⏭️ 跳过子文件夹(已含压缩包): {subdir_name}", "yellow")
+            return
+
+        archive_path = os.path.join(directory_path, subdir_name + ".zip")
+        _report("info", f"🔄 打包子文件夹: {subdir_name}", "blue")
+
+        # 循环内只拼接字符串，Path 仅在压缩器边界构造
+        result = self.compressor.compress_entire_folder(
+            Path(subdir),
+            Path(archive_path),
+            delete_source=False,  # 删除由下面单独处理，不让 7z 逐个文件 -sdel
+            keep_folder_structure=True  # 原逻辑是仅包含内容，不保留外层
+        )
+        if not result.success:
+            _report("error", f"❌ 子文件夹压缩失败: {subdir_name} -> {result.error_message}", "red")
+            return
+        if delete_after:
+            if delete_pool is not None:
+                delete_pool.submit(_remove_tree, subdir)
+            else:
+                _remove_tree(subdir)
     
     def pack_directory(self, directory_path: str, delete_after: bool = True):
         """处理指定目录的单层打包
@@ -66,93 +252,81 @@ class SinglePacker:
         try:
             directory_path = os.path.abspath(directory_path)
             if not os.path.exists(directory_path):
-                logger.error(f"❌ 目录不存在: {directory_path}")
-                console.print(f"[red]❌ 目录不存在: {directory_path}[/red]")
+                _report("error", f"❌ 目录不存在: {directory_path}", "red")
                 return
                 
             if not os.path.isdir(directory_path):
-                logger.error(f"❌ 指定路径不是目录: {directory_path}")
-                console.print(f"[red]❌ 指定路径不是目录: {directory_path}[/red]")
+                _report("error", f"❌ 指定路径不是目录: {directory_path}", "red")
                 return
                 
             base_name = os.path.basename(directory_path)
-            logger.info(f"🔄 开始处理目录: {directory_path}")
-            console.print(f"[blue]🔄 开始处理目录: {directory_path}[/blue]")
+            _report("info", f"🔄 开始处理目录: {directory_path}", "blue")
             
-            # 获取一级目录内容
-            items = os.listdir(directory_path)
+            # 获取一级目录内容：单次 os.scandir，类型取自 DirEntry，不再逐项 isdir/isfile；
+            # 散图由 compress_files 按扩展名通配自行匹配，这里只计数，不保存路径列表
             subdirs = []
-            images = []
+            image_count = 0
             
-            for item in items:
-                item_path = os.path.join(directory_path, item)
-                if os.path.isdir(item_path):
-                    subdirs.append(item_path)
-                elif os.path.isfile(item_path) and item_path.lower().endswith(self.SUPPORTED_IMAGE_EXTENSIONS):
-                    images.append(item_path)
+            with os.scandir(directory_path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        subdirs.append(entry.path)
+                    elif self._IMG_RE.search(entry.name) and entry.is_file():
+                        image_count += 1
             
             # 计算总任务数
-            total_tasks = len(subdirs) + (1 if images else 0)
-            current_task = 0
+            total_tasks = len(subdirs) + (1 if image_count else 0)
             
-            # 处理子文件夹 (使用 ZipCompressor)
-            for subdir in subdirs:
-                current_task += 1
-                progress = (current_task / total_tasks) * 100 if total_tasks else 100
-                logger.info(f"总进度: ({current_task}/{total_tasks}) {progress:.1f}%")
-                console.print(f"[cyan]总进度: ({current_task}/{total_tasks}) {progress:.1f}%[/cyan]")
-
-                subdir_name = os.path.basename(subdir)
-
-                # 检查内部是否已有压缩包
-                if self._has_internal_archive(subdir):
-                    logger.info(f"⏭️ 跳过子文件夹(已含压缩包): {subdir_name}")
-                    console.print(f"[yellow]⏭️ 跳过子文件夹(已含压缩包): {subdir_name}[/yellow]")
-                    continue
+            # 内部压缩包检查：一次遍历得到全部一级子文件夹的结果，不再逐个子文件夹单独递归扫描
+            archive_presence = _scan_archive_presence(directory_path) if subdirs else {}
+
+            # 总进度用 Rich 进度条显示：advance 只更新计数，由 Progress 按固定刷新率合并渲染，
+            # 不再每完成一项就格式化并打印/记录一行进度
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[bold blue]{task.description}"),
+                BarColumn(bar_width=40),
+                MofNCompleteColumn(),
+                TextColumn("•"),
+                TimeElapsedColumn(),
+                console=console
+            ) as progress:
+                total_task = progress.add_task("[cyan]总进度", total=total_tasks)
+
+                # 处理子文件夹 (使用 ZipCompressor)：各子文件夹互不相关，交给线程池并行打包
+                # 源文件夹删除交给独立的删除线程池，退出 with 时等待全部删除完成
+                with ThreadPoolExecutor(max_workers=2) as delete_pool, \
+                        ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
+                    futures = [
+                        executor.submit(self._pack_subdir, subdir, directory_path, delete_after,
+                                        archive_presence.get(subdir), delete_pool)
+                        for subdir in subdirs
+                    ]
+                    for future in as_completed(futures):
+                        future.result()
+                        progress.advance(total_task)
 
-                archive_path = Path(directory_path) / f"{subdir_name}.zip"
-                logger.info(f"🔄 打包子文件夹: {subdir_name}")
-                console.print(f"[blue]🔄 打包子文件夹: {subdir_name}[/blue]")
-
-                result = self.compressor.compress_entire_folder(
-                    Path(subdir),
-                    archive_path,
-                    delete_source=delete_after,
-                    keep_folder_structure=True  # 原逻辑是仅包含内容，不保留外层
-                )
-                if not result.success:
-                    logger.error(f"❌ 子文件夹压缩失败: {subdir_name} -> {result.error_message}")
-                    console.print(f"[red]❌ 子文件夹压缩失败: {subdir_name}[/red]")
-
-            # 处理散图文件 (复用 compress_files)
-            if images:
-                current_task += 1
-                progress = (current_task / total_tasks) * 100 if total_tasks else 100
-                logger.info(f"总进度: ({current_task}/{total_tasks}) {progress:.1f}%")
-                console.print(f"[cyan]总进度: ({current_task}/{total_tasks}) {progress:.1f}%[/cyan]")
-
-                images_archive_path = Path(directory_path) / f"{base_name}.zip"
-                logger.info(f"🔄 打包散图文件: {len(images)}个文件")
-                console.print(f"[blue]🔄 打包散图文件: {len(images)}个文件[/blue]")
-
-                # 使用 compress_files 非递归匹配同级图片；传入扩展名列表
-                image_ext_list = list(self.SUPPORTED_IMAGE_EXTENSIONS)
-                result = self.compressor.compress_files(
-                    Path(directory_path),
-                    images_archive_path,
-                    file_extensions=image_ext_list,
-                    delete_source=delete_after
-                )
-                if not result.success:
-                    logger.error(f"❌ 散图压缩失败: {result.error_message}")
-                    console.print(f"[red]❌ 散图压缩失败[/red]")
+                # 处理散图文件 (复用 compress_files)
+                if image_count:
+                    images_archive_path = os.path.join(directory_path, base_name + ".zip")
+                    _report("info", f"🔄 打包散图文件: {image_count}个文件", "blue")
+
+                    # 使用 compress_files 非递归匹配同级图片；传入扩展名列表
+                    image_ext_list = list(self.SUPPORTED_IMAGE_EXTENSIONS)
+                    result = self.compressor.compress_files(
+                        Path(directory_path),
+                        Path(images_archive_path),
+                        file_extensions=image_ext_list,
+                        delete_source=delete_after
+                    )
+                    if not result.success:
+                        _report("error", f"❌ 散图压缩失败: {result.error_message}", "red")
+                    progress.advance(total_task)
             
-            logger.info("✅ 打包完成")
-            console.print(f"[green]✅ 打包完成: {directory_path}[/green]")
+            _report("info", f"✅ 打包完成: {directory_path}", "green")
             
         except Exception as e:
-            logger.error(f"❌ 处理过程中出现错误: {str(e)}")
-            console.print(f"[red]❌ 处理过程中出现错误: {str(e)}[/red]")
+            _report("error", f"❌ 处理过程中出现错误: {str(e)}", "red")
     
     # 原 _create_archive 与 _cleanup_source 已由 ZipCompressor 取代
     
@@ -166,51 +340,68 @@ class SinglePacker:
         try:
             directory_path = os.path.abspath(directory_path)
             if not os.path.exists(directory_path):
-                logger.error(f"❌ 目录不存在: {directory_path}")
-                console.print(f"[red]❌ 目录不存在: {directory_path}[/red]")
+                _report("error", f"❌ 目录不存在: {directory_path}", "red")
                 return
                 
             if not os.path.isdir(directory_path):
-                logger.error(f"❌ 指定路径不是目录: {directory_path}")
-                console.print(f"[red]❌ 指定路径不是目录: {directory_path}[/red]")
+                _report("error", f"❌ 指定路径不是目录: {directory_path}", "red")
                 return
             
-            logger.info(f"🔍 开始扫描目录寻找.画集文件夹: {directory_path}")
-            console.print(f"[blue]🔍 开始扫描目录寻找.画集文件夹: {directory_path}[/blue]")
-            
-            gallery_folders = []
+            _report("info", f"🔍 开始扫描目录寻找.画集文件夹: {directory_path}", "blue")
             
-            # 递归查找所有.画集文件夹
-            for root, dirs, _ in os.walk(directory_path):
-                for dir_name in dirs:
-                    if ". 画集" in dir_name:
-                        gallery_path = os.path.join(root, dir_name)
-                        gallery_folders.append(gallery_path)
-            
-            if not gallery_folders:
-                logger.info(f"⚠️ 在目录中未找到任何.画集文件夹: {directory_path}")
-                console.print(f"[yellow]⚠️ 在目录中未找到任何.画集文件夹: {directory_path}[/yellow]")
+            # 扫描与打包流水线：扫描线程边遍历边把画集路径放入有界队列，主线程取出即打包，
+            # 目录树的遍历与前面画集的压缩重叠进行；None 为扫描结束标记。
+            # 画集内部不再深入：其子文件夹会在打包时被删除，嵌套的画集随外层一起打包
+            work_q: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=8)
+            stop = threading.Event()
+
+            def _is_gallery(entry: os.DirEntry) -> bool:
+                return _GALLERY_MARK in entry.name
+
+            def _put(item: Optional[str]) -> bool:
+                # 主线程中途退出时不再有人取队列，定时检查 stop 以免永久阻塞
+                while not stop.is_set():
+                    try:
+                        work_q.put(item, timeout=0.2)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+
+            def _scan_galleries() -> None:
+                try:
+                    for entry in _walk_dirs(directory_path, prune=_is_gallery):
+                        if _is_gallery(entry) and not _put(entry.path):
+                            return
+                finally:
+                    _put(None)
+
+            scanner = threading.Thread(target=_scan_galleries, name="gallery-scan", daemon=True)
+            scanner.start()
+
+            # 处理每个.画集文件夹 (总数在扫描结束前未知，进度只显示序号)
+            processed = 0
+            try:
+                while (gallery_folder := work_q.get()) is not None:
+                    processed += 1
+                    _report("info", f"画集处理进度: (第 {processed} 个)", "blue")
+                    
+                    _report("info", f"🔄 处理画集文件夹: {gallery_folder}", "cyan")
+                    
+                    self.pack_directory(gallery_folder, delete_after)
+            finally:
+                stop.set()
+                scanner.join()
+
+            if not processed:
+                _report("info", f"⚠️ 在目录中未找到任何.画集文件夹: {directory_path}", "yellow")
                 return
                 
-            logger.info(f"✅ 找到 {len(gallery_folders)} 个.画集文件夹")
-            console.print(f"[green]✅ 找到 {len(gallery_folders)} 个.画集文件夹[/green]")
-            
-            # 处理每个.画集文件夹
-            for i, gallery_folder in enumerate(gallery_folders):
-                logger.info(f"画集处理进度: ({i+1}/{len(gallery_folders)})")
-                console.print(f"[blue]画集处理进度: ({i+1}/{len(gallery_folders)})[/blue]")
-                
-                logger.info(f"🔄 处理画集文件夹: {gallery_folder}")
-                console.print(f"[cyan]🔄 处理画集文件夹: {gallery_folder}[/cyan]")
-                
-                self.pack_directory(gallery_folder, delete_after)
-                
-            logger.info(f"✅ 所有.画集文件夹处理完成")
-            console.print(f"[green]✅ 所有.画集文件夹处理完成[/green]")
+            _report("info", f"✅ 共处理 {processed} 个.画集文件夹", "green")
+            _report("info", "✅ 所有.画集文件夹处理完成", "green")
             
         except Exception as e:
-            logger.error(f"❌ 处理画集文件夹时出现错误: {str(e)}")
-            console.print(f"[red]❌ 处理画集文件夹时出现错误: {str(e)}[/red]")
+            _report("error", f"❌ 处理画集文件夹时出现错误: {str(e)}", "red")
 
 
 # 简单的测试代码
@@ -9,11 +9,12 @@ import os
 import shutil
 import subprocess
 import logging
-import json
 import re
 import time
 import signal
 import threading
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Union, Any, Optional, Tuple, Callable
 from datetime import datetime
@@ -22,6 +23,7 @@ from dataclasses import dataclass
 
 # 导入Rich库
 from repacku.config.config import get_compression_level
+from repacku.core.common_utils import DEFAULT_FILE_TYPES, read_json
 from rich.console import Console
 from rich.tree import Tree
 from rich.panel import Panel
@@ -54,6 +56,13 @@ COMPRESS_MODE_ENTIRE = "entire"      # 整体压缩
 COMPRESS_MODE_SELECTIVE = "selective" # 选择性压缩
 COMPRESS_MODE_SKIP = "skip"          # 跳过压缩
 
+# 配置中缺少某类型定义时，选择性压缩使用的内置扩展名表
+_FALLBACK_TYPE_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    "image": ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.avif'),
+    "video": ('.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv'),
+    "document": ('.pdf', '.doc', '.docx', '.txt', '.md'),
+}
+
 # 进度模式常量
 PROGRESS_MODE_FILES = "files"        # 按文件数量统计进度
 PROGRESS_MODE_SIZE = "size"          # 按文件大小统计进度
@@ -66,8 +75,33 @@ class PercentageColumn(ProgressColumn):
         return Text(f"{task.completed / task.total:.0%}")
 
 
+class _ThrottledLines:
+    """把逐条的结果行攒起来，按固定时间间隔合并成一次 console.print 输出
+    
+    大量小任务时避免每完成一项就单独渲染并刷新一次终端；结束时需调用 flush() 输出剩余行。
+    """
+    def __init__(self, target_console: Console, interval: float = 0.1):
+        self._console = target_console
+        self._interval = interval
+        self._lines: List[str] = []
+        self._last_flush = 0.0
+    
+    def add(self, line: str) -> None:
+        self._lines.append(line)
+        if time.monotonic() - self._last_flush >= self._interval:
+            self.flush()
+    
+    def flush(self) -> None:
+        if self._lines:
+            self._console.print("\n".join(self._lines))
+            self._lines.clear()
+        self._last_flush = time.monotonic()
+
+
 class CompressionResult:
     """压缩结果类"""
+    __slots__ = ("success", "original_size", "compressed_size", "error_message")
+    
     def __init__(self, success: bool, original_size: int = 0, compressed_size: int = 0, error_message: str = ""):
         self.success = success
         self.original_size = original_size
@@ -85,6 +119,66 @@ class CompressionTask:
     relative_path: str = ""
 
 
+def _format_result_line(display_path: str, result: "CompressionResult") -> str:
+    """单个压缩任务的结果行 (Rich 标记)"""
+    if result.success:
+        ratio = (1 - result.compressed_size / result.original_size) * 100 if result.original_size > 0 else 0
+        return (f"  [green]✓[/green] {display_path} | "
+                f"{result.original_size/1024/1024:.1f}MB → {result.compressed_size/1024/1024:.1f}MB "
+                f"([cyan]{ratio:.0f}%[/cyan])")
+    err_msg = result.error_message[:50] if result.error_message else "未知错误"
+    return f"  [red]✗[/red] {display_path} | {err_msg}"
+
+
+def _summarize_results(results: List[CompressionResult]) -> Tuple[int, int, int]:
+    """单次遍历汇总压缩结果，返回 (成功数, 成功项原始大小合计, 成功项压缩后大小合计)"""
+    success_count = total_original = total_compressed = 0
+    for r in results:
+        if r.success:
+            success_count += 1
+            total_original += r.original_size
+            total_compressed += r.compressed_size
+    return success_count, total_original, total_compressed
+
+
+def _create_folder_info(folder_data: Dict[str, Any], parent_path: str, depth: int) -> FolderInfo:
+    """从配置创建单个文件夹信息 (不含子文件夹)"""
+    folder_info = FolderInfo(
+        path=folder_data.get("path", ""),
+        name=folder_data.get("name", "未知文件夹"),
+        parent_path=parent_path,
+        depth=depth
+    )
+    folder_info.compress_mode = folder_data.get("compress_mode", "skip")
+    folder_info.total_files = folder_data.get("total_files", 0)
+    folder_info.file_types = folder_data.get("file_types", {})
+    folder_info.file_extensions = folder_data.get("file_extensions", {})  # 获取文件扩展名统计
+    folder_info.size_mb = folder_data.get("size_mb", 0)
+    folder_info.recommendation = folder_data.get("recommendation", "")
+    return folder_info
+
+
+def _config_to_folder_info(config_data: Dict[str, Any]) -> FolderInfo:
+    """从配置转换为FolderInfo结构：显式栈逐层创建子节点，不递归"""
+    if "folder_tree" in config_data:
+        folder_data = config_data["folder_tree"]
+    else:
+        folder_data = config_data
+    
+    # 创建根文件夹信息
+    root_info = _create_folder_info(folder_data, "", 0)
+    
+    stack = [(folder_data, root_info)]
+    while stack:
+        data, info = stack.pop()
+        for child_data in data.get("children") or ():
+            child_info = _create_folder_info(child_data, info.path, info.depth + 1)
+            info.children.append(child_info)
+            stack.append((child_data, child_info))
+    
+    return root_info
+
+
 class ZipCompressor:
     """压缩处理类，封装核心压缩操作，支持并行压缩"""
     def __init__(self, compression_level: int = None, threads: int = None, parallel_workers: int = None):
@@ -102,8 +196,9 @@ class ZipCompressor:
             self.compression_level = compression_level
         self.parallel_workers = parallel_workers or DEFAULT_PARALLEL_WORKERS
         self.threads = threads or DEFAULT_COMPRESS_THREADS
+        self._7z = _find_7z()
     
-    def compress_files(self, source_path: Path, target_zip: Path, file_extensions: List[str] = None, delete_source: bool = False) -> CompressionResult:
+    def compress_files(self, source_path: Union[str, os.PathLike], target_zip: Union[str, os.PathLike], file_extensions: List[str] = None, delete_source: bool = False) -> CompressionResult:
         """压缩文件到目标路径，使用通配符匹配特定扩展名的文件
         
         Args:
@@ -117,104 +212,80 @@ class ZipCompressor:
         """
         logging.info(f"[#process]🔄 开始选择性压缩文件: {source_path}")
         
-        # 确保source_path和target_zip是Path对象
-        if isinstance(source_path, str):
-            source_path = Path(source_path)
-        if isinstance(target_zip, str):
-            target_zip = Path(target_zip)
+        # 路径统一转成字符串处理一次，后续都用 os.path，不再来回构造 Path
+        source_path_str = os.fspath(source_path)
+        target_zip_str = os.fspath(target_zip)
         
-        # 获取文件夹名称和父目录
-        folder_name = source_path.name
-        parent_dir = source_path.parent
+        # 获取文件夹名称
+        folder_name = os.path.basename(source_path_str.rstrip("\\/"))
         
         # 确保目录存在
-        if not source_path.exists() or not source_path.is_dir():
-            error_msg = f"源文件夹不存在或不是目录: {source_path}"
+        if not os.path.isdir(source_path_str):
+            error_msg = f"源文件夹不存在或不是目录: {source_path_str}"
             logging.error(f"[#process]❌ {error_msg}")
             return CompressionResult(False, error_message=error_msg)
             
-        # 将路径转换为字符串，避免UNC路径问题
-        source_path_str = str(source_path)
-        target_zip_str = str(target_zip)
-        
-        # 统计匹配的文件
-        total_files = 0
-        total_size = 0
-        matched_extensions = set()
-        
-        # 统计文件夹中的文件类型分布
-        for file_path in source_path.glob('*'):  # 这里从rglob改为glob，不递归查找子文件夹
-            if file_path.is_file():
-                ext = file_path.suffix.lower()
-                # 如果没有指定扩展名列表，或者文件扩展名在列表中
-                if not file_extensions or ext in file_extensions:
-                    matched_extensions.add(ext)
-                    total_files += 1
-                    total_size += file_path.stat().st_size
+        # 扩展名列表只规范化一次为小写 frozenset，逐文件判断时是集合查找而不是列表遍历
+        ext_set = frozenset(ext.lower() for ext in file_extensions) if file_extensions else None
+        
+        if ext_set:
+            # 调用方已给出扩展名：通配符直接由扩展名生成，不收集实际存在的扩展名；
+            # 仍按当前目录内容确认至少有一个匹配文件 (找到第一个即停止)，配置过期时不会空跑 7z
+            matched_extensions = set(ext_set)
+            has_match = _has_file_with_ext(source_path_str, ext_set)
+        else:
+            # 未指定扩展名：扫描一遍，收集实际存在的扩展名 (不递归查找子文件夹)
+            matched_extensions = set()
+            with os.scandir(source_path_str) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        matched_extensions.add(_ext_of(entry.name))
+            has_match = bool(matched_extensions)
         
         # 如果没有匹配的文件，返回错误
-        if total_files == 0:
+        if not has_match:
             error_msg = "没有找到匹配的文件，不执行压缩"
             logging.warning(f"[#process]⚠️ {error_msg}")
             return CompressionResult(False, error_message=error_msg)
         
-        # 生成通配符参数
-        wildcard_patterns = []
+        # 生成通配符参数：扩展名排序一次，显示与 7z 参数共用，参数顺序也因此固定
+        sorted_extensions = sorted(matched_extensions)
+        # 使用"*.ext"格式，移除.前缀 (作为独立参数传给 7z，无需引号)；
+        # 只有无扩展名的文件时退回 "*"
+        wildcard_patterns = [f"*.{ext[1:]}" for ext in sorted_extensions if ext.startswith('.')] or ["*"]
         
-        # 如果有匹配的扩展名
-        if matched_extensions:
-            for ext in matched_extensions:
-                if ext and ext.startswith('.'):
-                    # 使用"*.ext"格式，移除.前缀
-                    wildcard_patterns.append(f"\"*.{ext[1:]}\"")
-            
-            # 显示匹配的文件类型
-            console.print(f"[cyan]📁 匹配的文件类型:[/]")
-            for ext in sorted(matched_extensions):
-                console.print(f"  • [green]{ext}[/]")
-                
-            wildcard_str = " ".join(wildcard_patterns)
-            logging.info(f"[#process]📦 使用通配符匹配文件: {wildcard_str}")
-        else:
-            # 如果没有匹配文件但total_files > 0，可能是文件没有扩展名
-            wildcard_str = "\"*\""
-            logging.info(f"[#process]📦 没有指定文件类型，使用通配符 {wildcard_str}")
+        # 显示文件类型：给出扩展名时列出的是请求的类型 (不一定每种都存在)，否则是实际找到的类型
+        label = "请求的文件类型" if ext_set else "匹配的文件类型"
+        console.print(f"[cyan]📁 {label}:[/]\n" + "\n".join(f"  • [green]{ext}[/]" for ext in sorted_extensions))
+        logging.info(f"[#process]📦 使用通配符匹配文件: {' '.join(wildcard_patterns)}")
         
         # 构建压缩命令
-        # 切换到源文件夹，使用绝对路径指定目标zip文件
-        cmd = f'cd /d "{source_path_str}" && "7z" a -tzip "{target_zip_str}" {wildcard_str} -aou -mx={self.compression_level} -mmt={self.threads}'
+        # 以源文件夹为工作目录直接启动 7z (参数列表，不经过 shell)，使用绝对路径指定目标zip文件
+        args = [self._7z, "a", "-tzip", target_zip_str, *wildcard_patterns,
+                "-aou", f"-mx={self.compression_level}", f"-mmt={self.threads}"]
         
         # 如果需要删除源文件，添加-sdel参数
         if delete_source:
-            cmd += " -sdel"
+            args.append("-sdel")
         
         # 执行压缩
         logging.info(f"[#process]🔄 执行压缩: {folder_name}")
         
-        process = subprocess.Popen(
-            cmd, 
-            shell=True, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            text=True
-        )
-        
-        stdout, stderr = process.communicate()
-        result_code = process.returncode
+        result_code, stdout, stderr = _run_7z(args, source_path_str)
         
         # 如果删除了源文件，删除空文件夹
         if delete_source and result_code == 0:
-            self._remove_empty_dirs(source_path)
+            self._remove_empty_dirs(source_path_str)
         
         # 处理结果
         if result_code == 0:
-            original_size = total_size
-            compressed_size = target_zip.stat().st_size if target_zip.exists() else 0
+            original_size = _parse_source_bytes(stdout)
+            compressed_size = _file_size(target_zip_str)
             return CompressionResult(True, original_size, compressed_size)
         else:
             return CompressionResult(False, error_message=stderr)
 
-    def compress_entire_folder(self, folder_path: Path, target_zip: Path, delete_source: bool = False, keep_folder_structure: bool = True) -> CompressionResult:
+    def compress_entire_folder(self, folder_path: Union[str, os.PathLike], target_zip: Union[str, os.PathLike], delete_source: bool = False, keep_folder_structure: bool = True) -> CompressionResult:
         """压缩整个文件夹
         
         Args:
@@ -225,111 +296,102 @@ class ZipCompressor:
         """
         logging.info(f"[#process]🔄 开始压缩整个文件夹: {folder_path}")
         
-        # 确保folder_path是Path对象
-        if isinstance(folder_path, str):
-            folder_path = Path(folder_path)
+        # 路径统一转成字符串处理一次，后续都用 os.path，不再来回构造 Path
+        folder_path_str = os.fspath(folder_path).rstrip("\\/") or os.fspath(folder_path)
+        target_zip_str = os.fspath(target_zip)
         
         # 获取文件夹名称和父目录
-        folder_name = folder_path.name
-        parent_dir = folder_path.parent
+        folder_name = os.path.basename(folder_path_str)
+        parent_dir_str = os.path.dirname(folder_path_str) or "."
+        default_zip_str = os.path.join(parent_dir_str, f"{folder_name}.zip")
         
         # 如果未提供target_zip或target_zip为默认值，则重新构造一个完整的目标名称
-        if target_zip == folder_path.with_suffix(".zip"):
+        if _same_path(target_zip_str, os.path.splitext(folder_path_str)[0] + ".zip"):
             # 使用文件夹完整名称作为压缩包名
-            target_zip = parent_dir / f"{folder_name}.zip"
+            target_zip_str = default_zip_str
         
         # 确保压缩包路径在父目录或源文件夹内部，保持target_zip的位置不变
         # 只有当路径既不在父目录又不在文件夹内时才调整
-        if target_zip.parent != folder_path and target_zip.parent != parent_dir:
+        target_parent_str = os.path.dirname(target_zip_str)
+        in_parent_dir = _same_path(target_parent_str, parent_dir_str)
+        if not in_parent_dir and not _same_path(target_parent_str, folder_path_str):
             logging.info(f"[#process]⚠️ 调整目标路径到父目录")
-            target_zip = parent_dir / f"{folder_name}.zip"
+            target_zip_str = default_zip_str
+            in_parent_dir = True
         
         # 记录实际使用的压缩包位置
-        if target_zip.parent == parent_dir:
+        if in_parent_dir:
             logging.info(f"[#process]📁 压缩包位置: 父目录")
         else:
             logging.info(f"[#process]📁 压缩包位置: 文件夹内部")
         
-        # 计算要处理的文件总数和总大小
-        total_files = 0
-        total_size = 0
-        
-        # 统计文件夹中的所有文件
-        for file_path in folder_path.rglob('*'):
-            if file_path.is_file():
-                total_files += 1
-                total_size += file_path.stat().st_size
-        
-        # 使用完整路径进行压缩
-        target_zip_str = str(target_zip)
-        folder_path_str = str(folder_path)
-        parent_dir_str = str(parent_dir)
-        
-        # 根据keep_folder_structure参数构建不同的命令
+        # 根据keep_folder_structure参数构建不同的命令 (参数列表 + 工作目录，不经过 shell)
         if keep_folder_structure:
-            cmd = f'cd /d "{parent_dir_str}" && "7z" a -tzip "{target_zip_str}" "{folder_name}\\" -r -mx={self.compression_level} -mmt={self.threads} -aou'
+            cwd = parent_dir_str
+            source_spec = folder_name + os.sep
         else:
-            cmd = f'cd /d "{folder_path_str}" && "7z" a -tzip "{target_zip_str}" * -r -mx={self.compression_level} -mmt={self.threads} -aou'
+            cwd = folder_path_str
+            source_spec = "*"
+        args = [self._7z, "a", "-tzip", target_zip_str, source_spec, "-r",
+                f"-mx={self.compression_level}", f"-mmt={self.threads}", "-aou"]
         
         # 如果需要删除源文件，添加-sdel参数
         if delete_source:
-            cmd += " -sdel"
+            args.append("-sdel")
         
         logging.info(f"[#process]�  执行压缩: {folder_name}")
         
         # 执行压缩
-        process = subprocess.Popen(
-            cmd, 
-            shell=True, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            text=True
-        )
-        
-        stdout, stderr = process.communicate()
-        result_code = process.returncode
+        result_code, stdout, stderr = _run_7z(args, cwd)
         
         # 如果压缩成功且需要删除源文件夹但未使用-sdel
-        if delete_source and result_code == 0 and not "-sdel" in cmd:
+        if delete_source and result_code == 0 and "-sdel" not in args:
             try:
                 # 删除整个文件夹
-                shutil.rmtree(folder_path)
-                logging.info(f"[#file_ops]🗑️ 已删除源文件夹: {folder_path}")
+                shutil.rmtree(folder_path_str)
+                logging.info(f"[#file_ops]🗑️ 已删除源文件夹: {folder_path_str}")
             except Exception as e:
                 logging.info(f"[#file_ops]⚠️ 删除源文件夹失败: {e}")
         
         # 处理结果
         if result_code == 0:
-            original_size = total_size
-            compressed_size = target_zip.stat().st_size if target_zip.exists() else 0
+            original_size = _parse_source_bytes(stdout)
+            compressed_size = _file_size(target_zip_str)
             return CompressionResult(True, original_size, compressed_size)
         else:
             return CompressionResult(False, error_message=stderr)
     
-    def _remove_empty_dirs(self, path: Path) -> None:
-        """递归删除空文件夹"""
-        if not path.is_dir():
-            return
-            
-        # 检查目录是否为空
+    def _remove_empty_dirs(self, path: Union[str, Path]) -> bool:
+        """递归删除空文件夹，返回 path 本身是否已被删除
+        
+        子项类型取自 os.scandir 的 DirEntry，不再为每个子项单独 is_file/is_dir/exists；
+        不进入符号链接目录，文件、符号链接等非目录子项都视为内容。
+        """
+        # 检查目录是否为空 (path 不存在或不是目录时直接返回)
         has_content = False
-        for item in path.iterdir():
-            if item.is_file():
-                has_content = True
-                break
-            if item.is_dir():
-                self._remove_empty_dirs(item)  # 递归处理子目录
-                # 检查子目录在处理后是否仍然存在
-                if item.exists():
-                    has_content = True
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        # 递归处理子目录，子目录处理后仍然存在则当前目录非空
+                        if not self._remove_empty_dirs(entry.path):
+                            has_content = True
+                    else:
+                        has_content = True
+                        break
+        except (FileNotFoundError, NotADirectoryError):
+            return False
         
         # 如果目录为空，删除它
-        if not has_content and path.exists():
-            try:
-                path.rmdir()
-                logging.info(f"[#file_ops]🗑️ 已删除空文件夹: {path}")
-            except Exception as e:
-                logging.info(f"[#file_ops]⚠️ 删除空文件夹失败: {e}")
+        if has_content:
+            return False
+        try:
+            os.rmdir(path)
+            logging.info(f"[#file_ops]🗑️ 已删除空文件夹: {path}")
+            return True
+        except Exception as e:
+            logging.info(f"[#file_ops]⚠️ 删除空文件夹失败: {e}")
+            return False
     
     def compress_from_json(self, config_path: Path, delete_after_success: bool = False, parallel: bool = True, on_progress: Optional[Callable[[int, str], None]] = None) -> List[CompressionResult]:
         """
@@ -345,70 +407,13 @@ class ZipCompressor:
             List[CompressionResult]: 压缩结果列表
         """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = read_json(config_path)
                 
             # 显示文件夹树结构 - 使用folder_analyzer模块中的函数
             logging.info("📂 文件夹分析结果:")
             
-            # 导入folder_analyzer中的FolderInfo来构建树状结构
-            from repacku.core.folder_analyzer import FolderInfo
-            
-            # 从配置转换为FolderInfo结构
-            def config_to_folder_info(config_data):
-                if "folder_tree" in config_data:
-                    folder_data = config_data["folder_tree"]
-                else:
-                    folder_data = config_data
-                
-                # 创建根文件夹信息
-                root_info = FolderInfo(
-                    path=folder_data.get("path", ""),
-                    name=folder_data.get("name", "未知文件夹"),
-                    depth=0
-                )
-                root_info.compress_mode = folder_data.get("compress_mode", "skip")
-                root_info.total_files = folder_data.get("total_files", 0)
-                root_info.file_types = folder_data.get("file_types", {})
-                root_info.file_extensions = folder_data.get("file_extensions", {})  # 获取文件扩展名统计
-                root_info.size_mb = folder_data.get("size_mb", 0)
-                root_info.recommendation = folder_data.get("recommendation", "")
-                
-                # 递归处理子文件夹
-                if "children" in folder_data and folder_data["children"]:
-                    for child_data in folder_data["children"]:
-                        child_info = _create_folder_info(child_data, root_info.path, root_info.depth + 1)
-                        if child_info:
-                            root_info.children.append(child_info)
-                
-                return root_info
-            
-            # 创建单个文件夹信息
-            def _create_folder_info(folder_data, parent_path, depth):
-                folder_info = FolderInfo(
-                    path=folder_data.get("path", ""),
-                    name=folder_data.get("name", "未知文件夹"),
-                    parent_path=parent_path,
-                    depth=depth
-                )
-                folder_info.compress_mode = folder_data.get("compress_mode", "skip")
-                folder_info.total_files = folder_data.get("total_files", 0)
-                folder_info.file_types = folder_data.get("file_types", {})
-                folder_info.file_extensions = folder_data.get("file_extensions", {})  # 获取文件扩展名统计
-                folder_info.size_mb = folder_data.get("size_mb", 0)
-                folder_info.recommendation = folder_data.get("recommendation", "")
-                
-                # 递归处理子文件夹
-                if "children" in folder_data and folder_data["children"]:
-                    for child_data in folder_data["children"]:
-                        child_info = _create_folder_info(child_data, folder_info.path, depth + 1)
-                        if child_info:
-                            folder_info.children.append(child_info)
-                
-                return folder_info
-            
             # 将配置转换为FolderInfo结构并显示
-            root_info = config_to_folder_info(config)
+            root_info = _config_to_folder_info(config)
             display_folder_structure(root_info)
             
             # 在控制台显示压缩配置文件
@@ -422,29 +427,17 @@ class ZipCompressor:
         root_path = folder_tree.get("path", "")
         target_file_types = config.get("config", {}).get("target_file_types", [])
         
-        # 收集要处理的所有文件夹
-        folders_to_process = []
-        
-        # 递归收集文件夹信息
-        def collect_folders(folder_data):
-            if not folder_data:
-                return
-                
-            # 添加当前文件夹
-            folders_to_process.append(folder_data)
-            
-            # 递归处理子文件夹
-            for child in folder_data.get("children", []):
-                collect_folders(child)
-        
-        # 从根节点开始收集
-        collect_folders(folder_tree)
-        
-        # 过滤出需要处理的文件夹
-        folders_to_compress = [
-            f for f in folders_to_process 
-            if f.get("compress_mode") in [COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE]
-        ]
+        # 单次显式栈遍历，只收集需要压缩的文件夹 (子节点逆序入栈，保持原先的先序顺序)
+        folders_to_compress = []
+        target_modes = {COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE}
+        stack = [folder_tree]
+        while stack:
+            node = stack.pop()
+            if not node:
+                continue
+            if node.get("compress_mode") in target_modes:
+                folders_to_compress.append(node)
+            stack.extend(reversed(node.get("children") or ()))
         total_folders = len(folders_to_compress)
         
         if total_folders == 0:
@@ -462,10 +455,8 @@ class ZipCompressor:
             results = self._compress_sequential(tasks, root_path, delete_after_success, on_progress)
         
         # 显示结果摘要
-        success_count = sum(1 for r in results if r.success)
+        success_count, total_original, total_compressed = _summarize_results(results)
         fail_count = len(results) - success_count
-        total_original = sum(r.original_size for r in results if r.success)
-        total_compressed = sum(r.compressed_size for r in results if r.success)
         total_ratio = (1 - total_compressed / total_original) * 100 if total_original > 0 else 0
         
         console.print(f"\n[green]✓ 完成[/green] {success_count}/{len(results)} | "
@@ -506,19 +497,12 @@ class ZipCompressor:
                     target_types = target_file_types if target_file_types else list(file_types.keys())
                     extensions_list = []
                     
-                    # 从 common_utils 获取类型定义
-                    from repacku.core.common_utils import DEFAULT_FILE_TYPES
-                    
+                    # 优先使用 common_utils 中的类型定义，配置中没有的类型回退到内置表
                     for file_type in target_types:
                         if file_type in DEFAULT_FILE_TYPES:
-                            extensions_list.extend(list(DEFAULT_FILE_TYPES[file_type]))
-                        # Fallback for hardcoded types if not in config
-                        elif file_type == "image":
-                            extensions_list.extend(['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.avif'])
-                        elif file_type == "video":
-                            extensions_list.extend(['.mp4', '.avi', '.mov', '.wmv', '.mkv', '.flv'])
-                        elif file_type == "document":
-                            extensions_list.extend(['.pdf', '.doc', '.docx', '.txt', '.md'])
+                            extensions_list.extend(DEFAULT_FILE_TYPES[file_type])
+                        else:
+                            extensions_list.extend(_FALLBACK_TYPE_EXTENSIONS.get(file_type, ()))
                 
                 task = CompressionTask(
                     folder_path=folder_path,
@@ -587,8 +571,11 @@ class ZipCompressor:
                 console=console
             ) as progress:
                 main_task = progress.add_task(f"[cyan]并行压缩: 0/{total_tasks}", total=total_tasks)
+                # 进度条由 Progress 的刷新线程定时重绘，结果行也合并后再输出
+                result_lines = _ThrottledLines(progress.console)
                 
-                with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
+                # 每个任务的工作都在 7z 子进程中完成，线程只负责等待，任务数少于工作线程数时不多开线程
+                with ThreadPoolExecutor(max_workers=max(1, min(self.parallel_workers, total_tasks))) as executor:
                     # 提交所有任务
                     futures = {
                         executor.submit(self._execute_single_task, task, delete_source): task
@@ -610,18 +597,8 @@ class ZipCompressor:
                             results.append(result)
                             completed += 1
                             
-                            # 显示单个任务结果
-                            display_path = task.relative_path[:40]
-                            if result.success:
-                                ratio = (1 - result.compressed_size / result.original_size) * 100 if result.original_size > 0 else 0
-                                progress.console.print(
-                                    f"  [green]✓[/green] {display_path} | "
-                                    f"{result.original_size/1024/1024:.1f}MB → {result.compressed_size/1024/1024:.1f}MB "
-                                    f"([cyan]{ratio:.0f}%[/cyan])"
-                                )
-                            else:
-                                err_msg = result.error_message[:50] if result.error_message else "未知错误"
-                                progress.console.print(f"  [red]✗[/red] {display_path} | {err_msg}")
+                            # 显示单个任务结果 (按时间间隔批量输出)
+                            result_lines.add(_format_result_line(task.relative_path[:40], result))
                             
                             progress.update(main_task, completed=completed,
                                            description=f"[cyan]并行压缩: {completed}/{total_tasks}")
@@ -636,6 +613,7 @@ class ZipCompressor:
                             completed += 1
                             results.append(CompressionResult(False, error_message=str(e)))
                             progress.update(main_task, completed=completed)
+                result_lines.flush()
         finally:
             # 恢复原始信号处理
             signal.signal(signal.SIGINT, original_handler)
@@ -659,6 +637,8 @@ class ZipCompressor:
             console=console
         ) as progress:
             main_task = progress.add_task(f"[cyan]压缩进度: 0/{total_tasks}", total=total_tasks)
+            # 进度条由 Progress 的刷新线程定时重绘，结果行也合并后再输出
+            result_lines = _ThrottledLines(progress.console)
             
             for idx, task in enumerate(tasks):
                 display_path = task.relative_path[:40]
@@ -667,17 +647,8 @@ class ZipCompressor:
                 _, result = self._execute_single_task(task, delete_source)
                 results.append(result)
                 
-                # 显示单个任务结果
-                if result.success:
-                    ratio = (1 - result.compressed_size / result.original_size) * 100 if result.original_size > 0 else 0
-                    progress.console.print(
-                        f"  [green]✓[/green] {display_path} | "
-                        f"{result.original_size/1024/1024:.1f}MB → {result.compressed_size/1024/1024:.1f}MB "
-                        f"([cyan]{ratio:.0f}%[/cyan])"
-                    )
-                else:
-                    err_msg = result.error_message[:50] if result.error_message else "未知错误"
-                    progress.console.print(f"  [red]✗[/red] {display_path} | {err_msg}")
+                # 显示单个任务结果 (按时间间隔批量输出)
+                result_lines.add(_format_result_line(display_path, result))
                 
                 # 调用进度回调
                 if on_progress:
@@ -686,12 +657,11 @@ class ZipCompressor:
                 
                 progress.update(main_task, completed=idx + 1,
                                description=f"[cyan]压缩进度: {idx + 1}/{total_tasks}")
+            result_lines.flush()
         
         # 显示结果摘要
-        success_count = sum(1 for r in results if r.success)
+        success_count, total_original, total_compressed = _summarize_results(results)
         fail_count = len(results) - success_count
-        total_original = sum(r.original_size for r in results if r.success)
-        total_compressed = sum(r.compressed_size for r in results if r.success)
         total_ratio = (1 - total_compressed / total_original) * 100 if total_original > 0 else 0
         
         console.print(f"\n[green]✓ 完成[/green] {success_count}/{len(results)} | "
@@ -708,9 +678,7 @@ class ZipCompressor:
             
         console.print(Panel("[bold]压缩结果摘要[/]", style="blue"))
         
-        total_original = sum(r.original_size for r in results if r.success)
-        total_compressed = sum(r.compressed_size for r in results if r.success)
-        success_count = sum(1 for r in results if r.success)
+        success_count, total_original, total_compressed = _summarize_results(results)
         fail_count = len(results) - success_count
         
         if total_original > 0:
@@ -725,6 +693,120 @@ class ZipCompressor:
                 if not result.success:
                     console.print(f"  [red]{i+1}. {result.error_message}[/]")
 
+@lru_cache(maxsize=1)
+def _find_7z() -> str:
+    """解析 7z 可执行文件路径 (进程内只查找一次)
+    
+    优先使用环境变量 SEVENZIP 指定的路径，其次在 PATH 中查找 7z / 7z.exe；
+    都找不到时退回裸命令名 "7z"，由启动时的错误信息提示未安装。
+    """
+    return os.environ.get("SEVENZIP") or shutil.which("7z") or shutil.which("7z.exe") or "7z"
+
+
+def _ext_of(name: str) -> str:
+    """按最后一个 "." 切出的小写扩展名 (含点)，没有 "." 时为空字符串"""
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot >= 0 else ""
+
+
+def _has_file_with_ext(folder: str, ext_set: frozenset) -> bool:
+    """folder 下 (不递归) 是否至少有一个扩展名在 ext_set 中的文件，找到第一个即返回"""
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False) and _ext_of(entry.name) in ext_set:
+                return True
+    return False
+
+
+def _same_path(a: str, b: str) -> bool:
+    """按字符串比较两个路径是否相同 (规范化分隔符与大小写，不访问文件系统)"""
+    return os.path.normcase(os.path.normpath(a)) == os.path.normcase(os.path.normpath(b))
+
+
+def _file_size(path: str) -> int:
+    """文件大小，文件不存在时返回 0"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+# 7z 输出只保留最后若干行，用于失败时的错误信息
+_7Z_OUTPUT_TAIL = 50
+
+
+def _run_7z(args: List[str], cwd: str) -> Tuple[int, str, str]:
+    """在 cwd 下直接启动 7z (参数列表，不经过 shell)，返回 (返回码, 输出, 错误信息)
+    
+    stderr 合并进 stdout 后逐行读取，只保留最后 _7Z_OUTPUT_TAIL 行和 "Add new data" 统计行，
+    内存占用与 7z 输出量无关，也不会因某一路管道写满而互相阻塞；失败时错误信息即保留的输出末尾。
+    7z 无法启动 (未安装、工作目录不存在等) 时不抛异常，返回非 0 返回码和错误信息，
+    与 7z 自身报错时一样由调用方按失败处理。
+    """
+    try:
+        process = subprocess.Popen(
+            args,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1
+        )
+    except OSError as e:
+        return -1, "", f"无法启动 7z: {e}"
+    tail = deque(maxlen=_7Z_OUTPUT_TAIL)
+    summary = ""
+    with process.stdout:
+        for line in process.stdout:
+            tail.append(line)
+            if not summary and _ADD_SUMMARY_RE.search(line):
+                summary = line
+    returncode = process.wait()
+    output = "".join(tail)
+    if summary and summary not in tail:
+        output = summary + output
+    return returncode, output, (output if returncode != 0 else "")
+
+
+# 7z a 结束时的统计行，例如 "Add new data to archive: 2 folders, 10 files, 123456 bytes (121 KiB)"
+_ADD_SUMMARY_RE = re.compile(r"Add new data to archive:.*?(\d+) bytes")
+
+
+def _parse_source_bytes(stdout: str) -> int:
+    """从 7z a 的输出中取出本次加入压缩包的源文件总字节数，找不到统计行时返回 0
+    
+    7z 压缩时本身就会遍历并统计源文件，直接复用其结果，不必在压缩前再单独扫描一遍目录树。
+    """
+    match = _ADD_SUMMARY_RE.search(stdout or "")
+    return int(match.group(1)) if match else 0
+
+
+def _tree_size(path: str) -> int:
+    """用显式栈 + os.scandir 累加目录树内所有文件的大小
+    
+    类型判断与大小都取自 DirEntry，不构造 Path；与 rglob 一致，不进入符号链接目录，
+    无法读取的目录直接跳过。
+    """
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            total += entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
 def get_folder_size(folder_path: Path) -> int:
     """计算文件夹大小"""
-    return sum(f.stat().st_size for f in folder_path.rglob('*') if f.is_file())
\ No newline at end of file
+    return _tree_size(os.fspath(folder_path))
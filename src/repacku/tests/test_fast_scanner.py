@@ -16,7 +16,7 @@ from repacku.core.fast_scanner import (
     ScanResult,
     _EXT_TO_TYPE_CACHE
 )
-from repacku.core.common_utils import COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE, COMPRESS_MODE_SKIP
+from repacku.core.common_utils import COMPRESS_MODE_ENTIRE, COMPRESS_MODE_SELECTIVE, COMPRESS_MODE_SKIP, ScanCache
 
 
 class TestFastGetFileType:
@@ -135,6 +135,51 @@ class TestFastScanner:
         assert not scanner._is_blacklisted_name("normal_folder")
 
 
+class TestScanCache:
+    """测试扫描结果缓存"""
+    
+    def test_cache_hit_and_invalidation(self):
+        """目录未变化时命中缓存，新增文件后重新扫描"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "data"
+            root.mkdir()
+            (root / "a.jpg").touch()
+            
+            with ScanCache(Path(tmpdir) / "cache" / "scan_cache") as cache:
+                scanner = FastScanner(max_workers=2, cache=cache)
+                first = scanner.scan_single_folder(root)
+                assert scanner.scan_single_folder(root) == first
+                
+                (root / "b.png").touch()
+                os.utime(root, ns=(0, root.stat().st_mtime_ns + 1))
+                assert scanner.scan_single_folder(root).total_files == 2
+    
+    def test_standard_tree_node_uses_cache(self):
+        """标准模式逐目录扫描同样按目录 mtime 复用条目列表"""
+        from repacku.core.folder_analyzer import FolderAnalyzer
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "data"
+            root.mkdir()
+            (root / "a.jpg").write_bytes(b"x" * 10)
+            mtime_ns = root.stat().st_mtime_ns
+            
+            with ScanCache(Path(tmpdir) / "cache" / "scan_cache") as cache:
+                analyzer = FolderAnalyzer()
+                _, _, files, size, _ = analyzer._scan_tree_node(root, "", 1, cache)
+                assert [f.name for f in files] == ["a.jpg"] and size == 10
+                
+                # mtime 不变：直接复用缓存的条目列表
+                (root / "b.png").touch()
+                os.utime(root, ns=(0, mtime_ns))
+                _, _, files, _, _ = analyzer._scan_tree_node(root, "", 1, cache)
+                assert [f.name for f in files] == ["a.jpg"]
+                
+                os.utime(root, ns=(0, mtime_ns + 1))
+                _, _, files, _, _ = analyzer._scan_tree_node(root, "", 1, cache)
+                assert sorted(f.name for f in files) == ["a.jpg", "b.png"]
+
+
 class TestFastFolderAnalyzer:
     """测试 FastFolderAnalyzer 类"""
     
@@ -1,6 +1,5 @@
 import pytest
 import os
-import json
 from pathlib import Path
 from repacku.core.folder_analyzer import FolderAnalyzer
 from repacku.core.zip_compressor import ZipCompressor
@@ -21,15 +20,11 @@ def test_selective_compression_only_images(tmp_path):
     # If the bug exists, .mp4 will be present
     print(f"File extensions in analysis: {root_info.file_extensions}")
     
-    # Generate config JSON
-    config_path = tmp_path / "config.json"
-    analyzer.generate_config_json(src_dir, output_path=config_path, target_file_types=['image'], root_info=root_info)
+    # Build the config dict in memory (same content generate_config_json writes)
+    config_data = analyzer.build_config_dict(src_dir, target_file_types=['image'], root_info=root_info)
     
     # Build tasks in ZipCompressor
     compressor = ZipCompressor()
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config_data = json.load(f)
-    
     folders_to_compress = [config_data["folder_tree"]]
     tasks = compressor._build_compression_tasks(folders_to_compress, str(tmp_path), ['image'])
     